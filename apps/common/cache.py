@@ -0,0 +1,40 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+
+def get_generation_key(name):
+    return f"generation:{name}"
+
+
+def get_generation(name):
+    """
+    Current value of the generation counter ``name``. Counters start from
+    the clock rather than 1, so a counter lost to eviction or a restart
+    never comes back with a value that old cache keys were built from.
+    """
+    key = get_generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generations(*names):
+    """Invalidate everything cached under the generation counters ``names``."""
+    for name in set(names):
+        key = get_generation_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+
+
+def make_cache_key(prefix, *parts):
+    digest = hashlib.md5(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"{prefix}:{digest}"
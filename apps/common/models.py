@@ -1,6 +1,7 @@
 from uuid import uuid4
 
 from django.db import models
+from django.db.models.fields.files import FieldFile
 
 
 class TimeStampedUUIDModel(models.Model):
@@ -11,3 +12,74 @@ class TimeStampedUUIDModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class DirtyFieldsMixin:
+    """
+    Model mixin that remembers the values a row was loaded or last saved
+    with, so saving an existing row only writes the changed columns (and
+    auto_now fields), and skips the write when nothing changed.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_values = instance.get_field_values()
+        return instance
+
+    def get_field_values(self, fields=None):
+        # Deferred fields are not in __dict__ and are never loaded here
+        values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            if fields is not None and not {field.name, field.attname} & set(fields):
+                continue
+            value = self.__dict__[field.attname]
+            if isinstance(value, FieldFile) and value._committed:
+                # Stored files compare by name, uploads waiting to be saved
+                # are always dirty
+                value = value.name
+            values[field.attname] = value
+        return values
+
+    def get_saved_values(self):
+        """Field values as last loaded from or saved to the database."""
+        return getattr(self, "_saved_values", {})
+
+    def get_dirty_fields(self):
+        saved = self.get_saved_values()
+        return {
+            name
+            for name, value in self.get_field_values().items()
+            if name not in saved or saved[name] != value
+        }
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._saved_values = {
+            **self.get_saved_values(),
+            **self.get_field_values(fields),
+        }
+
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and not self._state.adding
+            and not kwargs.get("force_insert", False)
+            and kwargs.get("update_fields", None) is None
+            and hasattr(self, "_saved_values")
+        ):
+            update_fields = self.get_dirty_fields()
+            if update_fields:
+                update_fields.update(
+                    field.attname
+                    for field in self._meta.concrete_fields
+                    if getattr(field, "auto_now", False)
+                )
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+        self._saved_values = {
+            **self.get_saved_values(),
+            **self.get_field_values(kwargs.get("update_fields", None)),
+        }
@@ -0,0 +1,57 @@
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, PhoneNumber):
+            return str(obj)
+        return super().default(obj)
+
+
+json_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed, producing
+    the same compact output as DRF. Indented output, ASCII-only output and
+    installs without orjson go through the stdlib encoder.
+    """
+
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        use_stdlib = (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        )
+        if use_stdlib:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            content = orjson.dumps(
+                data,
+                default=json_encoder.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict JavaScript subset, like JSONRenderer
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
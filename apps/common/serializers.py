@@ -0,0 +1,282 @@
+from collections import OrderedDict
+from functools import lru_cache
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models.constants import LOOKUP_SEP
+from django_countries.serializer_fields import CountryField
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+
+def get_field_selection(query_params):
+    """``fields``/``exclude`` serializer arguments from the query string."""
+    selection = {}
+    for param in ("fields", "exclude"):
+        names = [name.strip() for name in query_params.get(param, "").split(",")]
+        names = [name for name in names if name]
+        if names:
+            selection[param] = names
+    return selection
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin that renders a subset of its fields when given
+    ``fields`` and/or ``exclude`` keyword arguments.
+    """
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and exclude is None:
+            return
+
+        available = list(self.fields)
+        unknown = set(fields or ()).union(exclude or ()).difference(available)
+        if unknown:
+            raise ValidationError(
+                {
+                    "fields": f"Unknown fields {', '.join(sorted(unknown))}, "
+                    f"choose from {', '.join(available)}"
+                }
+            )
+
+        for name in available:
+            if (fields is not None and name not in fields) or name in (exclude or ()):
+                self.fields.pop(name)
+
+
+class ProjectionMixin:
+    """
+    ModelSerializer mixin that derives the ``select_related``/``only``
+    projection needed to render it, so a list costs one query.
+
+    Fields backed by a model field (including ``source="user.username"``)
+    are picked up automatically. Method fields and model properties must
+    declare the lookups they read in ``Meta.field_dependencies``, e.g.
+    ``{"user": ["user__username"]}``, or ImproperlyConfigured is raised.
+    Lookups read outside of fields, e.g. in ``to_representation``, go in
+    ``Meta.instance_dependencies``. To-many relations are prefetched.
+    """
+
+    @classmethod
+    def get_projection(cls, serializer=None):
+        if serializer is not None:
+            return cls._build_projection(serializer)
+        if "_projection" not in cls.__dict__:
+            cls._projection = cls._build_projection()
+        return cls._projection
+
+    @classmethod
+    def get_field_lookups(cls, serializer=None):
+        """
+        (field name, field, lookups, declared) for every serializer field,
+        where ``declared`` marks lookups from Meta.field_dependencies.
+        """
+        dependencies = getattr(cls.Meta, "field_dependencies", {})
+        serializer = serializer or cls()
+
+        field_lookups = []
+        for name, field in serializer.fields.items():
+            if name in dependencies:
+                field_lookups.append((name, field, dependencies[name], True))
+            elif isinstance(field, serializers.SerializerMethodField):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}.{name} is a method field, declare the fields it "
+                    f"reads in {cls.__name__}.Meta.field_dependencies"
+                )
+            else:
+                lookup = LOOKUP_SEP.join(field.source_attrs)
+                field_lookups.append((name, field, [lookup], False))
+        return field_lookups
+
+    @classmethod
+    def _build_projection(cls, serializer=None):
+        model = cls.Meta.model
+        lookups = [
+            lookup
+            for _, _, field_lookups, _ in cls.get_field_lookups(serializer)
+            for lookup in field_lookups
+        ]
+        lookups += getattr(cls.Meta, "instance_dependencies", [])
+
+        select_related = set()
+        prefetch_related = set()
+        only = set()
+        for lookup in lookups:
+            current = model
+            path = ""
+            parts = iter(lookup.split(LOOKUP_SEP))
+            for part in parts:
+                path = f"{path}{LOOKUP_SEP}{part}" if path else part
+                model_field = cls._get_model_field(current, part, lookup)
+                if model_field.many_to_many or model_field.one_to_many:
+                    # Prefetch along the rest of the lookup's relations
+                    for part in parts:
+                        current = model_field.related_model
+                        model_field = cls._get_model_field(current, part, lookup)
+                        if not model_field.is_relation:
+                            break
+                        path = f"{path}{LOOKUP_SEP}{part}"
+                    prefetch_related.add(path)
+                    break
+                only.add(path)
+                if not model_field.is_relation:
+                    break
+                current = model_field.related_model
+                select_related.add(path)
+
+        # A relation that is only loaded, not traversed, needs no join
+        select_related = {
+            path
+            for path in select_related
+            if any(name.startswith(f"{path}{LOOKUP_SEP}") for name in only)
+        }
+        return sorted(select_related), sorted(prefetch_related), sorted(only)
+
+    @classmethod
+    def _get_model_field(cls, model, name, lookup):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                f"{cls.__name__} reads {lookup!r}, which is not a field of "
+                f"{model.__name__}; declare what it reads in "
+                f"{cls.__name__}.Meta.field_dependencies"
+            )
+
+    @classmethod
+    def setup_queryset(cls, queryset, **selection):
+        serializer = cls(**selection) if selection else None
+        select_related, prefetch_related, only = cls.get_projection(serializer)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset.only(*only)
+
+
+class CompiledSerializer:
+    """
+    Read-only fast path for a ProjectionMixin serializer. Rows are fetched
+    as tuples with values_list() and every field is converted by a function
+    compiled once per serializer, skipping model instances and DRF's
+    per-row field machinery while producing the same representation.
+    """
+
+    def __init__(self, serializer_class, context=None, **selection):
+        self.serializer = serializer_class(context=context or {}, **selection)
+        _, prefetch_related, _ = serializer_class.get_projection(self.serializer)
+        if prefetch_related:
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__} reads to-many relations, which "
+                "cannot be compiled"
+            )
+        self.model = serializer_class.Meta.model
+        self.lookups = []
+        self.dependencies = []
+        self.converters = []
+
+        field_lookups = serializer_class.get_field_lookups(self.serializer)
+        for name, field, lookups, declared in field_lookups:
+            for lookup in lookups:
+                if lookup not in self.lookups:
+                    self.lookups.append(lookup)
+            if declared:
+                for lookup in lookups:
+                    position = self.lookups.index(lookup)
+                    self.dependencies.append((lookup.split(LOOKUP_SEP), position))
+                self.converters.append((name, self.compile_declared(field)))
+            else:
+                position = self.lookups.index(lookups[0])
+                self.converters.append((name, self.compile_column(field, position)))
+
+        self.row_class = type(
+            f"{self.model.__name__}Row", (SimpleNamespace,), self.get_properties()
+        )
+
+    def get_properties(self):
+        # Model properties read by declared fields run against the row
+        properties = {}
+        for klass in reversed(self.model.__mro__):
+            for name, attribute in vars(klass).items():
+                if isinstance(attribute, property) and name != "pk":
+                    properties[name] = attribute
+        return properties
+
+    def get_converter(self, field):
+        if isinstance(field, serializers.FileField):
+            return self.compile_file(field)
+        if isinstance(field, CountryField):
+            return lru_cache(maxsize=None)(field.to_representation)
+        return SIMPLE_CONVERTERS.get(type(field), field.to_representation)
+
+    def compile_file(self, field):
+        storage = self.model._meta.get_field(field.source_attrs[-1]).storage
+        use_url = getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+        request = field.context.get("request", None)
+
+        def convert(name):
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            if request is not None:
+                return request.build_absolute_uri(url)
+            return url
+
+        return convert
+
+    def compile_column(self, field, position):
+        convert = self.get_converter(field)
+
+        def convert_column(row, instance):
+            value = row[position]
+            return None if value is None else convert(value)
+
+        return convert_column
+
+    def compile_declared(self, field):
+        def convert_declared(row, instance):
+            attribute = field.get_attribute(instance)
+            return None if attribute is None else field.to_representation(attribute)
+
+        return convert_declared
+
+    def build_instance(self, row):
+        instance = self.row_class()
+        for parts, position in self.dependencies:
+            target = instance
+            for part in parts[:-1]:
+                if not hasattr(target, part):
+                    setattr(target, part, SimpleNamespace())
+                target = getattr(target, part)
+            setattr(target, parts[-1], row[position])
+        return instance
+
+    def values(self, queryset, extra_fields=()):
+        """``queryset`` as named rows holding what the serializer reads."""
+        names = self.lookups + [
+            name for name in extra_fields if name not in self.lookups
+        ]
+        return queryset.values_list(*names, named=True)
+
+    def to_representation(self, rows):
+        data = []
+        for row in rows:
+            instance = self.build_instance(row) if self.dependencies else None
+            data.append(
+                OrderedDict(
+                    (name, convert(row, instance)) for name, convert in self.converters
+                )
+            )
+        return data
+
+
+SIMPLE_CONVERTERS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+    serializers.BooleanField: bool,
+}
@@ -1,3 +1,71 @@
+import io
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer, JSONEncoder
+
+
+class StdlibJSONRenderer(JSONRenderer):
+    encoder_class = JSONEncoder
+
+
+class FastJSONRendererTests(TestCase):
+    data = {
+        "price": Decimal("1000000.50"),
+        "created_at": timezone.now(),
+        "naive": datetime(2022, 1, 2, 3, 4, 5, 123456),
+        "date": date(2022, 1, 2),
+        "id": uuid.uuid4(),
+        "phone_number": PhoneNumber.from_string("+14155552671"),
+        "description": "Line\u2028and paragraph\u2029separators, and Goa é",
+        "wide": 2**70,
+        1: None,
+    }
+
+    def assertRendersLikeJSONRenderer(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            StdlibJSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_compact_output_matches_json_renderer(self):
+        self.assertRendersLikeJSONRenderer(self.data)
+        self.assertRendersLikeJSONRenderer([self.data, {"nested": [self.data]}])
+
+    def test_indented_output_matches_json_renderer(self):
+        self.assertRendersLikeJSONRenderer(self.data, "application/json; indent=2")
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class FastJSONParserTests(TestCase):
+    def parse(self, content, parser_class=FastJSONParser, encoding="utf-8"):
+        return parser_class().parse(
+            io.BytesIO(content), parser_context={"encoding": encoding}
+        )
+
+    def test_parses_like_json_parser(self):
+        content = '{"title": "Goa é", "price": 1.5, "tags": [null, true]}'.encode()
+        self.assertEqual(self.parse(content), self.parse(content, JSONParser))
+
+    def test_round_trips_rendered_output(self):
+        data = {"title": "Villa\u2028", "rooms": [1, 2], "price": "10.00"}
+        self.assertEqual(self.parse(FastJSONRenderer().render(data)), data)
+
+    def test_other_encodings_use_json_parser(self):
+        content = '{"city": "São Paulo"}'.encode("latin-1")
+        self.assertEqual(self.parse(content, encoding="latin-1"), {"city": "São Paulo"})
 
-# Create your tests here.
+    def test_invalid_json_is_a_parse_error(self):
+        with self.assertRaises(ParseError):
+            self.parse(b'{"title": ')
@@ -1,3 +1,196 @@
-from django.shortcuts import render
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
 
-# Create your views here.
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .cache import get_generation, make_cache_key
+from .serializers import CompiledSerializer, get_field_selection
+
+
+def get_request_signature(request):
+    """
+    What identifies the response to a GET ``request``: its URL with the
+    query parameters sorted and empty ones dropped, and the media type.
+    """
+    params = sorted(
+        (name, [value for value in values if value])
+        for name, values in request.query_params.lists()
+    )
+    return [
+        request.build_absolute_uri(request.path),
+        request.accepted_media_type,
+        [(name, values) for name, values in params if values],
+    ]
+
+
+def get_aggregate_validators(queryset, aggregates):
+    aggregates = queryset.aggregate(**aggregates)
+    modified = [value for value in aggregates.values() if isinstance(value, datetime)]
+    return aggregates, max(modified, default=None)
+
+
+def conditional_get(handler):
+    """
+    Decorate a view's ``get`` to send a strong ETag and a Last-Modified
+    header from the view's ``get_validators()``, which returns (version,
+    last modified datetime or None) or None to skip. Both are worked out
+    before the body is built, and a client whose copy is current gets 304
+    Not Modified without it being built at all.
+    """
+
+    @wraps(handler)
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators(request, *args, **kwargs)
+        if validators is None:
+            return handler(self, request, *args, **kwargs)
+
+        version, last_modified = validators
+        signature = json.dumps(
+            [get_request_signature(request), version], sort_keys=True, default=str
+        )
+        etag = quote_etag(hashlib.md5(signature.encode("utf-8")).hexdigest())
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(self, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    return get
+
+
+class ProjectedQuerysetMixin:
+    """
+    Generic view mixin that loads only what ``serializer_class`` renders,
+    using the projection declared by its ProjectionMixin. ``?fields=`` and
+    ``?exclude=`` narrow both the output and the projection.
+    """
+
+    def get_field_selection(self):
+        return get_field_selection(self.request.query_params)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.get_field_selection())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return self.get_serializer_class().setup_queryset(
+            queryset, **self.get_field_selection()
+        )
+
+
+class CompiledListMixin(ProjectedQuerysetMixin):
+    """
+    List view mixin that renders rows through a CompiledSerializer instead
+    of building a model instance and serializer fields for every row.
+    """
+
+    def get_compiled_serializer(self):
+        return CompiledSerializer(
+            self.get_serializer_class(),
+            context=self.get_serializer_context(),
+            **self.get_field_selection(),
+        )
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # Keyset paginators read their ordering fields back from the rows
+        extra_fields = ()
+        if hasattr(self.paginator, "get_ordering_fields"):
+            extra_fields = self.paginator.get_ordering_fields(queryset)
+        queryset = compiled.values(queryset, extra_fields)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.to_representation(page))
+        return Response(compiled.to_representation(queryset))
+
+
+class CachedListMixin:
+    """
+    List view mixin that caches rendered JSON pages per normalised query
+    string. Keys include the generation counters named by
+    ``get_cache_generations()``, so bumping a counter invalidates every page
+    built from it. That holds across workers only when they share the cache
+    backend (see CACHES); with a per-process cache, other workers serve
+    their pages until the timeout runs out.
+    """
+
+    cache_prefix = None
+    cache_timeout = None
+
+    def get_cache_timeout(self):
+        return self.cache_timeout
+
+    def get_cache_generations(self):
+        return []
+
+    def get_cache_key(self, request):
+        generations = {
+            name: get_generation(name) for name in self.get_cache_generations()
+        }
+        return make_cache_key(
+            self.cache_prefix or f"list:{type(self).__name__}",
+            *get_request_signature(request),
+            generations,
+        )
+
+    def list(self, request, *args, **kwargs):
+        timeout = self.get_cache_timeout()
+        if not timeout or request.accepted_renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+
+        cache_key = self.get_cache_key(request)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            if isinstance(response, Response):
+                response = self.finalize_response(request, response, *args, **kwargs)
+                response.render()
+            cache.set(cache_key, (response.content, response["Content-Type"]), timeout)
+        return response
+
+
+class ConditionalListMixin:
+    """
+    List view mixin for conditional GETs, validated by aggregating the
+    filtered queryset with ``validator_aggregates``, e.g. the newest
+    ``updated_at`` and the row count, instead of rendering the page. No
+    Last-Modified is sent: the newest ``updated_at`` does not move when a
+    row is deleted.
+    """
+
+    validator_aggregates = {
+        "last_modified": Max("updated_at"),
+        "count": Count("pkid", distinct=True),
+    }
+
+    def get_validators(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        aggregates, _ = get_aggregate_validators(queryset, self.validator_aggregates)
+        return aggregates, None
+
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
@@ -1,15 +1,17 @@
-import json
+from apps.common.renderers import FastJSONRenderer
 
-from rest_framework.renderers import JSONRenderer
 
-
-class ProfileJSONRenderer(JSONRenderer):
+class ProfileJSONRenderer(FastJSONRenderer):
     charset = "utf-8"
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         errors = data.get("errors", None)
 
         if errors is not None:
-            return super(ProfileJSONRenderer, self).render(data)
+            return super(ProfileJSONRenderer, self).render(
+                data, accepted_media_type, renderer_context
+            )
 
-        return json.dumps({"profile": data})
+        return super(ProfileJSONRenderer, self).render(
+            {"profile": data}, accepted_media_type, renderer_context
+        )
@@ -1,12 +1,15 @@
 from django_countries.serializer_fields import CountryField
 from rest_framework import serializers
 
+from apps.common.serializers import ProjectionMixin, SparseFieldsMixin
 from apps.ratings.serializers import RatingSerializer
 
 from .models import Profile
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(
+    SparseFieldsMixin, ProjectionMixin, serializers.ModelSerializer
+):
     username = serializers.CharField(source="user.username")
     first_name = serializers.CharField(source="user.first_name")
     last_name = serializers.CharField(source="user.last_name")
@@ -38,6 +41,11 @@ class ProfileSerializer(serializers.ModelSerializer):
             "num_reviews",
             "reviews",
         ]
+        field_dependencies = {
+            "full_name": ["user__first_name", "user__last_name"],
+            "reviews": ["agent_review__rater", "agent_review__agent__user"],
+        }
+        instance_dependencies = ["is_top_agent"]
 
     def get_full_name(self, obj):
         first_name = obj.user.first_name.title()
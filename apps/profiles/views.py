@@ -1,34 +1,65 @@
+from django.db.models import Count, Max
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.serializers import get_field_selection
+from apps.common.views import (
+    ConditionalListMixin,
+    ProjectedQuerysetMixin,
+    conditional_get,
+    get_aggregate_validators,
+)
+
 from .exceptions import NotYourProfile, ProfileNotFound
 from .models import Profile
 from .renderers import ProfileJSONRenderer
 from .serializers import ProfileSerializer, UpdateProfileSerializer
 
+# Saving a user saves their profile, so updated_at also covers the user
+# fields; reviews are versioned separately
+PROFILE_VALIDATOR_AGGREGATES = {
+    "last_modified": Max("updated_at"),
+    "count": Count("pkid", distinct=True),
+    "reviews": Count("agent_review", distinct=True),
+    "reviews_modified": Max("agent_review__updated_at"),
+}
+
 
-class AgentListAPIView(generics.ListAPIView):
+class AgentListAPIView(
+    ConditionalListMixin, ProjectedQuerysetMixin, generics.ListAPIView
+):
     permission_classes = [permissions.IsAuthenticated]
     queryset = Profile.objects.filter(is_agent=True)
     serializer_class = ProfileSerializer
+    validator_aggregates = PROFILE_VALIDATOR_AGGREGATES
 
 
-class TopAgentsListAPIView(generics.ListAPIView):
+class TopAgentsListAPIView(
+    ConditionalListMixin, ProjectedQuerysetMixin, generics.ListAPIView
+):
     permission_classes = [permissions.IsAuthenticated]
     queryset = Profile.objects.filter(is_top_agent=True)
     serializer_class = ProfileSerializer
+    validator_aggregates = PROFILE_VALIDATOR_AGGREGATES
 
 
 class GetProfileAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     renderer_classes = [ProfileJSONRenderer]
 
+    def get_validators(self, request):
+        profiles = Profile.objects.filter(user=request.user).order_by()
+        return get_aggregate_validators(profiles, PROFILE_VALIDATOR_AGGREGATES)
+
+    @conditional_get
     def get(self, request):
         user = self.request.user
-        user_profile = Profile.objects.get(user=user)
+        selection = get_field_selection(request.query_params)
+        queryset = ProfileSerializer.setup_queryset(Profile.objects.all(), **selection)
+        user_profile = queryset.get(user=user)
         context = {"request": request}
-        serializer = ProfileSerializer(user_profile, context=context)
+        serializer = ProfileSerializer(user_profile, context=context, **selection)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
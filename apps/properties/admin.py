@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Property, PropertyView
+from .models import Property, PropertyTombstone, PropertyView, PropertyViewSketch
 
 
 class PropertyAdmin(admin.ModelAdmin):
@@ -8,5 +8,12 @@ class PropertyAdmin(admin.ModelAdmin):
     list_filter = ["advert_type", "property_type", "country"]
 
 
+class PropertyViewSketchAdmin(admin.ModelAdmin):
+    list_display = ["property", "unique_viewers", "bloom_rotated_at"]
+    exclude = ["hyperloglog", "bloom_filter", "previous_bloom_filter"]
+
+
 admin.site.register(Property, PropertyAdmin)
 admin.site.register(PropertyView)
+admin.site.register(PropertyViewSketch, PropertyViewSketchAdmin)
+admin.site.register(PropertyTombstone)
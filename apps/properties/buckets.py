@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from .models import Property
+
+ANY = "any"
+
+CHOICE_CRITERIA = {
+    "advert_type": Property.AdvertType,
+    "property_type": Property.PropertyType,
+}
+
+
+def get_bucket_filter(field, label):
+    """
+    Q object for one of the PROPERTY_SEARCH_BUCKETS labels of ``field``.
+    Buckets are inclusive (min, max) bounds where None leaves a side open.
+    """
+    if label is None or label == "" or label == ANY:
+        return Q()
+
+    buckets = settings.PROPERTY_SEARCH_BUCKETS[field]
+    label = str(label)
+    if label not in buckets:
+        raise ValidationError({field: f"Must be one of {', '.join([ANY, *buckets])}"})
+
+    lower, upper = buckets[label]
+    if lower is not None and lower == upper:
+        return Q(**{field: lower})
+    bounds = Q()
+    if lower is not None:
+        bounds &= Q(**{f"{field}__gte": lower})
+    if upper is not None:
+        bounds &= Q(**{f"{field}__lte": upper})
+    return bounds
+
+
+def get_canonical_choice(field, value):
+    """
+    Map ``value`` case-insensitively onto the stored choice so the filter is
+    an exact match the composite search index can serve.
+    """
+    choices = {choice.lower(): choice for choice in CHOICE_CRITERIA[field].values}
+    try:
+        return choices[str(value).lower()]
+    except KeyError:
+        raise ValidationError(
+            {field: f"Must be one of {', '.join(CHOICE_CRITERIA[field].values)}"}
+        )
+
+
+def get_criteria_filters(data):
+    """Q object for each structured search criterion present in ``data``."""
+    criteria_filters = {}
+    for field in CHOICE_CRITERIA:
+        value = data.get(field, None)
+        if value:
+            value = get_canonical_choice(field, value)
+            criteria_filters[field] = Q(**{field: value})
+
+    for field in settings.PROPERTY_SEARCH_BUCKETS:
+        bucket_filter = get_bucket_filter(field, data.get(field, None))
+        if bucket_filter:
+            criteria_filters[field] = bucket_filter
+
+    return criteria_filters
+
+
+def get_normalized_criteria(data):
+    """
+    The structured criteria in ``data`` with choices canonicalised and
+    "any" dropped, so equivalent filter sets compare equal.
+    """
+    criteria = {}
+    for field in CHOICE_CRITERIA:
+        value = data.get(field, None)
+        if value:
+            criteria[field] = get_canonical_choice(field, value)
+
+    for field in settings.PROPERTY_SEARCH_BUCKETS:
+        label = data.get(field, None)
+        if get_bucket_filter(field, label):
+            criteria[field] = str(label)
+
+    return criteria
+
+
+def get_facet_options(field):
+    """(value, Q object) for every option of a structured criterion."""
+    if field in CHOICE_CRITERIA:
+        return [(value, Q(**{field: value})) for value in CHOICE_CRITERIA[field].values]
+    return [
+        (label, get_bucket_filter(field, label))
+        for label in settings.PROPERTY_SEARCH_BUCKETS[field]
+    ]
+
+
+def filter_by_criteria(queryset, data):
+    """Apply the structured search criteria in ``data`` to ``queryset``."""
+    return queryset.filter(*get_criteria_filters(data).values())
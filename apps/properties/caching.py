@@ -0,0 +1,161 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.common.cache import bump_generations, get_generation, make_cache_key
+
+from .models import Property
+from .representations import get_version, render_representations
+
+User = get_user_model()
+
+# Generation counters behind the cached property list pages. Every change to
+# a property bumps the list generation and its agent's own, and a change to
+# a published property also bumps the catalogue generation behind cached
+# searches and facets. View flushes bump the views generation instead, which
+# only searches key on, since facets do not show view counts.
+LIST_GENERATION = "properties:list"
+CATALOGUE_GENERATION = "properties:catalogue"
+VIEWS_GENERATION = "properties:views"
+
+
+def get_agent_generation(user_id):
+    return f"properties:agent:{user_id}"
+
+
+def invalidate_property_lists(user_ids=(), published=False, views=False):
+    # Only once committed, so no request rebuilds a page from the old rows
+    # under the new generation
+    names = [LIST_GENERATION]
+    if published:
+        names.append(VIEWS_GENERATION if views else CATALOGUE_GENERATION)
+    names += [get_agent_generation(user_id) for user_id in user_ids if user_id]
+    transaction.on_commit(lambda: bump_generations(*names))
+
+
+def get_catalogue_cache_key(prefix, *parts):
+    """A cache key for ``parts`` that changes with every published property."""
+    return make_cache_key(prefix, get_generation(CATALOGUE_GENERATION), *parts)
+
+
+def get_search_generations():
+    """What search results are versioned by: published rows and their views."""
+    return [get_generation(CATALOGUE_GENERATION), get_generation(VIEWS_GENERATION)]
+
+
+def get_detail_key(slug):
+    # Payloads rendered by an older PropertySerializer are never served
+    return f"properties:detail:{get_version()}:{slug}"
+
+
+def get_detail_version_key(slug):
+    return f"properties:detail:pointer:{slug}"
+
+
+def get_detail_version(pkid, updated_at, views, agent_modified):
+    """
+    (pkid, version, last modified) of a property detail. Views are counted
+    without touching updated_at, and the agent's username is rendered too;
+    saving a user saves their profile.
+    """
+    last_modified = max(updated_at, agent_modified or updated_at)
+    agent_modified = agent_modified.isoformat() if agent_modified else ""
+    return pkid, f"{updated_at.isoformat()}:{views}:{agent_modified}", last_modified
+
+
+def get_agent_modified(property):
+    return (
+        User.objects.filter(pk=property.user_id)
+        .values_list("profile__updated_at", flat=True)
+        .first()
+    )
+
+
+def set_detail_version(property):
+    """Point the detail cache of ``property`` at its saved state."""
+    key = get_detail_version_key(property.slug)
+    version = get_detail_version(
+        property.pkid,
+        property.updated_at,
+        property.views,
+        get_agent_modified(property),
+    )
+    transaction.on_commit(
+        lambda: cache.set(key, version, settings.PROPERTY_DETAIL_CACHE_TIMEOUT)
+    )
+
+
+def invalidate_property_details(slugs, delete=False):
+    keys = [get_detail_version_key(slug) for slug in slugs]
+    if delete:
+        keys += [get_detail_key(slug) for slug in slugs]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def load_detail_version(slug):
+    """
+    (pkid, version, last modified) of the property at ``slug``, or None if
+    there is none.
+    """
+    key = get_detail_version_key(slug)
+    version = cache.get(key)
+    if version is None:
+        row = (
+            Property.objects.filter(slug=slug)
+            .values_list("pkid", "updated_at", "views", "user__profile__updated_at")
+            .first()
+        )
+        if row is None:
+            return None
+        version = get_detail_version(*row)
+        # Never overwrite a version set by a save that committed meanwhile
+        cache.add(key, version, settings.PROPERTY_DETAIL_CACHE_TIMEOUT)
+    return version
+
+
+def get_cached_detail(slug):
+    """
+    (pkid, encoded representation) of the property at ``slug``, or None.
+
+    Only one worker rebuilds an out of date entry, holding a lock taken with
+    cache.add(). Meanwhile the others serve the previous copy, or wait up to
+    PROPERTY_DETAIL_CACHE_LOCK_TIMEOUT seconds for the rebuild when there is
+    none, then build it themselves. add() is only atomic across processes on
+    a Redis or Memcached backend; on the file backend the lock only holds
+    within one process.
+    """
+    version = load_detail_version(slug)
+    if version is None:
+        return None
+    pkid, current, _ = version
+
+    key = get_detail_key(slug)
+    entry = cache.get(key)
+    if entry is not None and entry[0] == current:
+        return pkid, entry[1]
+
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.PROPERTY_DETAIL_CACHE_LOCK_TIMEOUT
+    locked = cache.add(lock_key, True, lock_timeout)
+    if not locked:
+        if entry is not None:
+            return pkid, entry[1]
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None:
+                return pkid, entry[1]
+
+    try:
+        content = render_representations([pkid]).get(pkid, None)
+        if content is None:
+            return None
+        cache.set(key, (current, content), settings.PROPERTY_DETAIL_CACHE_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return pkid, content
@@ -0,0 +1,116 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+
+from .models import PropertyTombstone
+from .pagination import KeysetPagination
+
+encode_value = KeysetPagination.encode_value
+decode_value = KeysetPagination.decode_value
+
+
+def get_settled_time():
+    """
+    Changes are only reported once they are PROPERTY_CHANGES_SETTLE_SECONDS
+    old. updated_at is taken before the transaction commits, so a row that
+    commits late can carry a time a consumer's cursor has already passed.
+    """
+    return timezone.now() - timedelta(seconds=settings.PROPERTY_CHANGES_SETTLE_SECONDS)
+
+
+def encode_cursor(position):
+    payload = {
+        name: [encode_value(value) for value in values]
+        for name, values in position.items()
+    }
+    token = urlsafe_b64encode(json.dumps(payload).encode("ascii")).decode("ascii")
+    return token.rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padding = "=" * (-len(token) % 4)
+        payload = json.loads(urlsafe_b64decode(token + padding))
+        position = {
+            name: [decode_value(value) for value in payload[name]]
+            for name in ("changed", "deleted")
+        }
+        for name, values in position.items():
+            if len(values) != 2:
+                raise ValueError("Cursor positions are (time, pkid) pairs")
+            time, pkid = values
+            # Only a feed started from scratch has no time for changes yet
+            if not isinstance(time, datetime) and not (
+                name == "changed" and time is None
+            ):
+                raise ValueError("Cursor times must be datetimes")
+            if time is not None and timezone.is_naive(time):
+                raise ValueError("Cursor times must be timezone aware")
+            if type(pkid) is not int:
+                raise ValueError("Cursor pkids must be integers")
+    except (TypeError, ValueError, KeyError):
+        raise NotFound("Invalid cursor")
+
+    retention = timedelta(days=settings.PROPERTY_TOMBSTONE_RETENTION_DAYS)
+    if position["deleted"][0] < timezone.now() - retention:
+        raise ValidationError(
+            {"cursor": "Deletions this old are no longer kept, sync from scratch"}
+        )
+    return position
+
+
+def seek(queryset, time_field, position):
+    time, pkid = position
+    return queryset.filter(
+        Q(**{f"{time_field}__gt": time}) | Q(**{time_field: time, "pkid__gt": pkid})
+    )
+
+
+def get_changes(position, limit, queryset):
+    """
+    The next ``limit`` changes after ``position`` from ``queryset``, in
+    (time, pkid) order: (changed rows, tombstones, next position, has_more).
+
+    Without a position the feed starts with every property and reports
+    deletions from now on, which is all a consumer syncing from scratch needs.
+    """
+    settled = get_settled_time()
+    if position is None:
+        position = {"changed": [None, 0], "deleted": [settled, 0]}
+
+    changed = queryset.filter(updated_at__lte=settled)
+    if position["changed"][0] is not None:
+        changed = seek(changed, "updated_at", position["changed"])
+    changed = list(changed.order_by("updated_at", "pkid")[: limit + 1])
+
+    deleted = seek(
+        PropertyTombstone.objects.filter(deleted_at__lte=settled),
+        "deleted_at",
+        position["deleted"],
+    )
+    deleted = list(deleted.order_by("deleted_at", "pkid")[: limit + 1])
+
+    # Merge both streams by time and keep the first ``limit`` events
+    events = sorted(
+        [(row.updated_at, 0, row.pkid, row) for row in changed]
+        + [
+            (tombstone.deleted_at, 1, tombstone.pkid, tombstone)
+            for tombstone in deleted
+        ]
+    )
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    changed = [row for _, kind, _, row in events if kind == 0]
+    deleted = [tombstone for _, kind, _, tombstone in events if kind == 1]
+    position = dict(position)
+    if changed:
+        position["changed"] = [changed[-1].updated_at, changed[-1].pkid]
+    if deleted:
+        position["deleted"] = [deleted[-1].deleted_at, deleted[-1].pkid]
+    return changed, deleted, position, has_more
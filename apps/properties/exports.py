@@ -0,0 +1,65 @@
+import csv
+import io
+from itertools import islice
+
+from django.conf import settings
+
+from apps.common.serializers import CompiledSerializer
+
+from .representations import renderer
+from .serializers import PropertySerializer
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def iter_batches(queryset, compiled, chunk_size):
+    """
+    Serialized rows of ``queryset``, ``chunk_size`` at a time. Rows are read
+    through iterator(), which uses a server-side cursor on PostgreSQL, so
+    only one chunk is held in memory however many rows there are.
+    """
+    rows = compiled.values(queryset).iterator(chunk_size=chunk_size)
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            return
+        yield compiled.to_representation(batch)
+
+
+def encode_ndjson(batches):
+    for batch in batches:
+        yield b"".join(renderer.render(item) + b"\n" for item in batch)
+
+
+def encode_csv(header, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for batch in batches:
+        writer.writerows(item.values() for item in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Only the header, for an empty export
+        yield buffer.getvalue().encode("utf-8")
+
+
+def export_properties(
+    queryset, export_format, context=None, chunk_size=None, **selection
+):
+    """
+    An iterator over ``queryset`` encoded as JSON lines or as CSV with a
+    header line, yielding bytes a chunk of PROPERTY_EXPORT_CHUNK_SIZE rows
+    at a time. Fields are those of PropertySerializer, narrowed by
+    ``fields``/``exclude``, which are checked up front.
+    """
+    chunk_size = chunk_size or settings.PROPERTY_EXPORT_CHUNK_SIZE
+    compiled = CompiledSerializer(PropertySerializer, context=context, **selection)
+    batches = iter_batches(queryset, compiled, chunk_size)
+    if export_format == "ndjson":
+        return encode_ndjson(batches)
+    return encode_csv(list(compiled.serializer.fields), batches)
@@ -0,0 +1,102 @@
+from functools import reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .buckets import (
+    CHOICE_CRITERIA,
+    filter_by_criteria,
+    get_criteria_filters,
+    get_facet_options,
+    get_normalized_criteria,
+)
+from .caching import get_catalogue_cache_key
+from .locality import filter_by_location
+from .models import Property
+from .search import search_properties
+
+FACET_FIELDS = (*CHOICE_CRITERIA, *settings.PROPERTY_SEARCH_BUCKETS)
+
+
+def get_normalized_filters(data):
+    """
+    The search filter set in ``data`` in a canonical form, which is both
+    the facet cache key and what the facets are computed from.
+    """
+    filters = get_normalized_criteria(data)
+    # Both text matches are case-insensitive
+    for param in ("location", "query"):
+        value = " ".join(str(data.get(param, None) or "").lower().split())
+        if value:
+            filters[param] = value
+    return filters
+
+
+def get_search_queryset(filters, criteria=False, limit=None):
+    """
+    Published properties matching the location and text query in
+    ``filters``, and their structured criteria too with ``criteria``. At
+    most ``limit`` text matches are kept, once everything else has been
+    applied.
+    """
+    queryset = Property.published.all()
+    if "location" in filters:
+        queryset = filter_by_location(queryset, filters["location"])
+    if criteria:
+        queryset = filter_by_criteria(queryset, filters)
+    if "query" in filters:
+        queryset = search_properties(queryset, filters["query"], limit=limit)
+    return queryset
+
+
+def compute_facets(filters):
+    """
+    Count every option of every facet in one aggregate query. Each facet is
+    counted under all the other criteria but not its own, so a client can
+    see what selecting a different option would return.
+    """
+    criteria_filters = get_criteria_filters(filters)
+    # Every text match is counted, not just the ones a search would page
+    # through, so the counts agree with the criteria-filtered results
+    queryset = get_search_queryset(filters).order_by()
+
+    def combine(conditions):
+        return reduce(lambda left, right: left & right, conditions, Q())
+
+    aggregates = {"count": Count("pkid", filter=combine(criteria_filters.values()))}
+    options = {}
+    for field in FACET_FIELDS:
+        others = combine(
+            condition for name, condition in criteria_filters.items() if name != field
+        )
+        options[field] = get_facet_options(field)
+        for index, (_, condition) in enumerate(options[field]):
+            aggregates[f"{field}_{index}"] = Count("pkid", filter=others & condition)
+
+    counts = queryset.aggregate(**aggregates)
+    return {
+        "count": counts["count"],
+        "facets": {
+            field: [
+                {
+                    "value": value,
+                    "count": counts[f"{field}_{index}"],
+                    "selected": filters.get(field, None) == value,
+                }
+                for index, (value, _) in enumerate(options[field])
+            ]
+            for field in FACET_FIELDS
+        },
+    }
+
+
+def get_facets(data):
+    filters = get_normalized_filters(data)
+    cache_key = get_catalogue_cache_key("properties:facets", filters)
+
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = compute_facets(filters)
+        cache.set(cache_key, facets, settings.PROPERTY_FACETS_CACHE_TTL)
+    return facets
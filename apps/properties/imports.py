@@ -0,0 +1,131 @@
+import csv
+import json
+import logging
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Property, PropertySlugCounter, generate_ref_code
+from .serializers import PropertyImportSerializer
+from .signals import properties_bulk_created
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}
+
+
+def get_import_format(filename):
+    """The import format of ``filename`` going by its extension, or None."""
+    extension = os.path.splitext(filename)[1].lstrip(".").lower()
+    return IMPORT_FORMATS.get(extension, None)
+
+
+def read_rows(stream, import_format):
+    """
+    The rows of a CSV text stream with a header line, or of a JSON lines
+    stream, as dicts. Empty CSV cells are left out so the field defaults
+    apply, and a line that is not valid JSON is passed on as is for
+    validation to report.
+    """
+    if import_format == "csv":
+        for row in csv.DictReader(stream):
+            yield {
+                name: value
+                for name, value in row.items()
+                if name is not None and value not in ("", None)
+            }
+        return
+
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+def allocate_ref_codes(count):
+    codes = set()
+    while len(codes) < count:
+        wanted = {generate_ref_code() for _ in range(count - len(codes))}
+        taken = Property.objects.filter(ref_code__in=wanted).values_list(
+            "ref_code", flat=True
+        )
+        codes.update(wanted.difference(taken))
+    return list(codes)
+
+
+def create_properties(properties):
+    """
+    Insert unsaved ``properties`` with one bulk_create(), allocating their
+    slugs and reference codes up front, and send properties_bulk_created so
+    everything post_save keeps current catches up.
+    """
+    slugs = PropertySlugCounter.objects.allocate(
+        [property.title for property in properties]
+    )
+    ref_codes = allocate_ref_codes(len(properties))
+    for property, slug, ref_code in zip(properties, slugs, ref_codes):
+        property.slug = slug
+        property.ref_code = ref_code
+
+    with transaction.atomic():
+        Property.objects.bulk_create(properties)
+        properties_bulk_created.send(
+            sender=Property, instances=properties, using=Property.objects.db
+        )
+    return properties
+
+
+def import_properties(rows, user, batch_size=None):
+    """
+    Validate ``rows`` and insert them as properties of ``user``, at most
+    ``batch_size`` (PROPERTY_IMPORT_BATCH_SIZE) at a time, each batch in its
+    own transaction. Invalid rows are skipped, and so are the rows of a
+    batch the database rejects, leaving the other batches in.
+
+    Returns {"created": count, "errors": [{"row": n, "errors": ...}]} with
+    rows numbered from 1.
+    """
+    batch_size = batch_size or settings.PROPERTY_IMPORT_BATCH_SIZE
+    serializer = PropertyImportSerializer()
+    created = 0
+    errors = []
+
+    rows = enumerate(rows, 1)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        properties = []
+        numbers = []
+        for number, row in batch:
+            try:
+                data = serializer.run_validation(row)
+            except ValidationError as error:
+                errors.append({"row": number, "errors": error.detail})
+                continue
+            property = Property(user=user, **data)
+            property.normalize_text()
+            properties.append(property)
+            numbers.append(number)
+        if not properties:
+            continue
+
+        try:
+            created += len(create_properties(properties))
+        except IntegrityError:
+            logger.exception(f"Could not import rows {numbers[0]}-{numbers[-1]}")
+            errors += [
+                {"row": number, "errors": ["The batch holding this row was rejected"]}
+                for number in numbers
+            ]
+
+    errors.sort(key=lambda error: error["row"])
+    return {"created": created, "errors": errors}
@@ -0,0 +1,359 @@
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, Count, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Greatest
+from django_countries import countries
+
+from .models import Property
+
+LOCALITY_FIELDS = ("city", "street_address", "postal_code")
+AUTOCOMPLETE_FIELDS = ("city", "country", "postal_code")
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def trigrams(value):
+    """Trigrams of ``value`` the way pg_trgm extracts them."""
+    grams = set()
+    for word in WORD_PATTERN.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(a + b + c for a, b, c in zip(padded, padded[1:], padded[2:]))
+    return frozenset(grams)
+
+
+class FieldValueIndex:
+    """
+    Distinct values of one Property field with listing counts, and a
+    trigram -> values inverted index over them for similarity lookups.
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.counts = Counter()
+        self.grams = {}
+        self.postings = defaultdict(set)
+
+    def add(self, value, count=1):
+        if not value:
+            return
+        if value not in self.counts:
+            self.grams[value] = trigrams(value)
+            for gram in self.grams[value]:
+                self.postings[gram].add(value)
+        self.counts[value] += count
+
+    def discard(self, value, count=1):
+        if value not in self.counts:
+            return
+        self.counts[value] -= count
+        if self.counts[value] <= 0:
+            del self.counts[value]
+            for gram in self.grams.pop(value):
+                self.postings[gram].discard(value)
+                if not self.postings[gram]:
+                    del self.postings[gram]
+
+    def similar(self, query, threshold, limit):
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        shared = Counter()
+        for gram in query_grams:
+            for value in self.postings.get(gram, ()):
+                shared[value] += 1
+
+        matches = []
+        for value, common in shared.items():
+            score = common / (len(query_grams) + len(self.grams[value]) - common)
+            if score >= threshold:
+                matches.append((value, score))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+
+class PrefixIndex:
+    """
+    Distinct (field, value) pairs with listing counts, kept in a list sorted
+    by normalised label so prefix lookups are a bisect plus a short scan.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.entries = []
+
+    @staticmethod
+    def label(field, value):
+        if field == "country":
+            return str(countries.name(value)) or value
+        return value
+
+    def add(self, field, value, count=1):
+        if not value:
+            return
+        if (field, value) not in self.counts:
+            label = self.label(field, value)
+            insort(self.entries, (label.lower(), field, value, label))
+        self.counts[(field, value)] += count
+
+    def discard(self, field, value, count=1):
+        if (field, value) not in self.counts:
+            return
+        self.counts[(field, value)] -= count
+        if self.counts[(field, value)] <= 0:
+            del self.counts[(field, value)]
+            label = self.label(field, value)
+            entry = (label.lower(), field, value, label)
+            position = bisect_left(self.entries, entry)
+            if position < len(self.entries) and self.entries[position] == entry:
+                del self.entries[position]
+
+    def lookup(self, prefix, fields, limit, scan_limit):
+        prefix = prefix.lower()
+        matches = []
+        position = bisect_left(self.entries, (prefix,))
+        for key, field, value, label in islice(self.entries, position, None):
+            if not key.startswith(prefix) or len(matches) >= scan_limit:
+                break
+            if field in fields:
+                matches.append((field, value, label, self.counts[(field, value)]))
+        matches.sort(key=lambda match: (-match[3], match[2]))
+        return matches[:limit]
+
+
+class InMemoryPropertyIndex(ABC):
+    """
+    Base for in-process indexes over Property field values. Signals keep
+    them current for writes made by this process, and they are rebuilt from
+    the database every PROPERTY_LOCALITY_INDEX_TTL seconds to pick up writes
+    made by other processes.
+    """
+
+    fields = ()
+
+    def __init__(self):
+        self.built_at = None
+        self.lock = threading.RLock()
+
+    def is_stale(self):
+        return (
+            self.built_at is None
+            or time.monotonic() - self.built_at > settings.PROPERTY_LOCALITY_INDEX_TTL
+        )
+
+    def ensure_built(self):
+        if self.is_stale():
+            self.rebuild()
+
+    @abstractmethod
+    def rebuild(self):
+        pass
+
+    @abstractmethod
+    def get_entries(self, values):
+        """
+        The (field, value) pairs a property with these field values
+        contributes, or None when some of them were not loaded.
+        """
+
+    @abstractmethod
+    def add_entry(self, field, value):
+        pass
+
+    @abstractmethod
+    def discard_entry(self, field, value):
+        pass
+
+    def add(self, values):
+        self.change({}, values, created=True)
+
+    def remove(self, values):
+        with self.lock:
+            entries = self.get_entries(values)
+            if self.built_at is not None and entries is not None:
+                for field, value in entries:
+                    self.discard_entry(field, value)
+
+    def change(self, old_values, new_values, created=False):
+        with self.lock:
+            if self.built_at is None:
+                return
+            old_entries = [] if created else self.get_entries(old_values)
+            new_entries = self.get_entries(new_values)
+            if old_entries is None or new_entries is None:
+                return
+            if sorted(old_entries) == sorted(new_entries):
+                return
+            for field, value in old_entries:
+                self.discard_entry(field, value)
+            for field, value in new_entries:
+                self.add_entry(field, value)
+
+
+class LocalityIndex(InMemoryPropertyIndex):
+    """Trigram index over the distinct locality values of every property."""
+
+    fields = LOCALITY_FIELDS
+
+    def __init__(self):
+        super().__init__()
+        self.indexes = {}
+
+    def rebuild(self):
+        indexes = {field: FieldValueIndex(field) for field in self.fields}
+        for field, index in indexes.items():
+            values = (
+                Property.objects.order_by()
+                .values_list(field)
+                .annotate(count=Count("pkid"))
+            )
+            for value, count in values:
+                index.add(value, count)
+
+        with self.lock:
+            self.indexes = indexes
+            self.built_at = time.monotonic()
+
+    def get_entries(self, values):
+        if not all(field in values for field in self.fields):
+            return None
+        return [(field, values[field]) for field in self.fields]
+
+    def add_entry(self, field, value):
+        self.indexes[field].add(value)
+
+    def discard_entry(self, field, value):
+        self.indexes[field].discard(value)
+
+    def similar(self, field, query, threshold=None, limit=None):
+        if threshold is None:
+            threshold = settings.PROPERTY_FUZZY_MATCH_THRESHOLD
+        if limit is None:
+            limit = settings.PROPERTY_FUZZY_MATCH_LIMIT
+        self.ensure_built()
+        with self.lock:
+            return self.indexes[field].similar(query, threshold, limit)
+
+
+class AutocompleteIndex(InMemoryPropertyIndex):
+    """
+    Prefix index over the distinct cities, countries and postal codes of
+    published properties, with the number of published listings for each.
+    """
+
+    fields = AUTOCOMPLETE_FIELDS
+
+    def __init__(self):
+        super().__init__()
+        self.index = PrefixIndex()
+
+    def rebuild(self):
+        index = PrefixIndex()
+        for field in self.fields:
+            values = (
+                Property.published.order_by()
+                .values_list(field)
+                .annotate(count=Count("pkid"))
+            )
+            for value, count in values:
+                index.add(field, value, count)
+
+        with self.lock:
+            self.index = index
+            self.built_at = time.monotonic()
+
+    def get_entries(self, values):
+        if not all(field in values for field in self.fields + ("published_status",)):
+            return None
+        if not values["published_status"]:
+            return []
+        return [(field, values[field]) for field in self.fields]
+
+    def add_entry(self, field, value):
+        self.index.add(field, value)
+
+    def discard_entry(self, field, value):
+        self.index.discard(field, value)
+
+    def suggest(self, prefix, fields=None, limit=None):
+        self.ensure_built()
+        with self.lock:
+            return self.index.lookup(
+                prefix,
+                fields or self.fields,
+                limit or settings.PROPERTY_AUTOCOMPLETE_LIMIT,
+                settings.PROPERTY_AUTOCOMPLETE_SCAN_LIMIT,
+            )
+
+
+locality_index = LocalityIndex()
+autocomplete_index = AutocompleteIndex()
+
+
+def filter_by_location(queryset, query, fields=LOCALITY_FIELDS, country=None):
+    """
+    Filter ``queryset`` to properties whose locality fields are similar to
+    ``query``, annotated with the best ``similarity`` and ordered by it,
+    then by the queryset's own ordering. Properties in ``country``, the code
+    of a country ``query`` names, match too, as closely as an exact match.
+    """
+    threshold = settings.PROPERTY_FUZZY_MATCH_THRESHOLD
+    ordering = ["-similarity", *(queryset.query.order_by or ["-created_at"]), "-pkid"]
+    country_scores = []
+    if country:
+        country_scores.append(
+            Case(
+                When(country=country, then=Value(1.0)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+    if connections[queryset.db].vendor == "postgresql":
+        # The % operator is served by the gin_trgm_ops indexes and uses
+        # pg_trgm.similarity_threshold, which is set per connection
+        matches = Q(country=country) if country else Q()
+        for field in fields:
+            matches |= Q(**{f"{field}__trigram_similar": query})
+        similarity = Greatest(
+            *[TrigramSimilarity(field, query) for field in fields], *country_scores
+        )
+        return (
+            queryset.filter(matches)
+            .annotate(similarity=Cast(similarity, FloatField()))
+            .filter(similarity__gte=threshold)
+            .order_by(*ordering)
+        )
+
+    matches = Q(country=country) if country else Q()
+    scores = list(country_scores)
+    for field in fields:
+        similar_values = locality_index.similar(field, query, threshold)
+        if not similar_values:
+            continue
+        matches |= Q(**{f"{field}__in": [value for value, _ in similar_values]})
+        scores.append(
+            Case(
+                *[
+                    When(**{field: value}, then=Value(score))
+                    for value, score in similar_values
+                ],
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+    if not scores:
+        return queryset.none()
+
+    similarity = Greatest(*scores) if len(scores) > 1 else scores[0]
+    return queryset.filter(matches).annotate(similarity=similarity).order_by(*ordering)
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.properties.exports import EXPORT_CONTENT_TYPES, export_properties
+from apps.properties.models import Property
+from apps.properties.views import PropertyFilter
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream published properties as JSON lines or CSV to a file or stdout, "
+        "optionally narrowed by the list filters, e.g. --filter advert_type=For Sale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Defaults to stdout")
+        parser.add_argument(
+            "--output-format", choices=list(EXPORT_CONTENT_TYPES), default="ndjson"
+        )
+        parser.add_argument(
+            "--filter", action="append", default=[], metavar="NAME=VALUE"
+        )
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            data = dict(value.split("=", 1) for value in options["filter"])
+        except ValueError:
+            raise CommandError("Filters are given as NAME=VALUE")
+        unknown = set(data).difference(PropertyFilter.base_filters)
+        if unknown:
+            raise CommandError(f"Unknown filters {', '.join(sorted(unknown))}")
+        filterset = PropertyFilter(data, queryset=Property.published.order_by("pkid"))
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        content = export_properties(
+            filterset.qs, options["output_format"], chunk_size=options["chunk_size"]
+        )
+        if options["output"] is None:
+            for chunk in content:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        with open(options["output"], "wb") as output:
+            for chunk in content:
+                output.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}"))
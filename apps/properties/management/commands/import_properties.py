@@ -0,0 +1,55 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.properties.imports import get_import_format, import_properties, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import properties for an agent from a CSV file with a header line or "
+        "a JSON lines file. Invalid rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="Agent email or username")
+        parser.add_argument(
+            "--input-format",
+            choices=["csv", "jsonl"],
+            help="Defaults to the file extension",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        import_format = options["input_format"] or get_import_format(options["path"])
+        if import_format is None:
+            raise CommandError(
+                "Pass --input-format for files not ending in .csv or .jsonl"
+            )
+
+        user = (
+            User.objects.filter(email=options["user"]).first()
+            or User.objects.filter(username=options["user"]).first()
+        )
+        if user is None:
+            raise CommandError(f"No user {options['user']}")
+
+        with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+            report = import_properties(
+                read_rows(stream, import_format),
+                user,
+                batch_size=options["batch_size"],
+            )
+
+        for error in report["errors"]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} properties, "
+                f"skipped {len(report['errors'])} rows"
+            )
+        )
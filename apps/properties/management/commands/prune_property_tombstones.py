@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.properties.models import PropertyTombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete tombstones of properties deleted more than the retention "
+        "window ago. Change feed cursors older than that must sync from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.PROPERTY_TOMBSTONE_RETENTION_DAYS,
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["retention_days"])
+        pruned, _ = PropertyTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} tombstones"))
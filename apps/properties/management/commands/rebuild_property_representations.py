@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.properties.representations import rebuild_representations
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render the stored JSON representation of every property, e.g. "
+        "after PropertySerializer changes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        refreshed = rebuild_representations(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rendered {refreshed} properties"))
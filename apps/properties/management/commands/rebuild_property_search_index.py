@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.properties.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the property full-text index: the search_vector column on "
+        "PostgreSQL, the built-in inverted index elsewhere."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} properties"))
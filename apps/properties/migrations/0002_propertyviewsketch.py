@@ -0,0 +1,58 @@
+# Generated by Django 4.1 on 2026-10-17 06:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PropertyViewSketch",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "unique_viewers",
+                    models.IntegerField(
+                        default=0, verbose_name="Estimated unique viewers"
+                    ),
+                ),
+                ("hyperloglog", models.BinaryField(default=bytes)),
+                ("bloom_filter", models.BinaryField(default=bytes)),
+                ("previous_bloom_filter", models.BinaryField(default=bytes)),
+                (
+                    "bloom_rotated_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "property",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="view_sketch",
+                        to="properties.property",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Property view sketch",
+                "verbose_name_plural": "Property View Sketches",
+            },
+        ),
+    ]
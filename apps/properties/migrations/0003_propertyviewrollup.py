@@ -0,0 +1,97 @@
+# Generated by Django 4.1 on 2026-10-17 06:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+from collections import Counter
+
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    PropertyView = apps.get_model("properties", "PropertyView")
+    PropertyViewRollup = apps.get_model("properties", "PropertyViewRollup")
+
+    counts = Counter()
+    views = PropertyView.objects.values_list("property_id", "created_at")
+    for property_id, created_at in views.iterator(chunk_size=2000):
+        created_at = timezone.localtime(created_at)
+        hour = created_at.replace(minute=0, second=0, microsecond=0)
+        counts[(property_id, "hour", hour)] += 1
+        counts[(property_id, "day", hour.replace(hour=0))] += 1
+
+    PropertyViewRollup.objects.bulk_create(
+        [
+            PropertyViewRollup(
+                property_id=property_id,
+                granularity=granularity,
+                bucket=bucket,
+                views=count,
+            )
+            for (property_id, granularity, bucket), count in counts.items()
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0002_propertyviewsketch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PropertyViewRollup",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("hour", "Hour"), ("day", "Day")],
+                        max_length=10,
+                        verbose_name="Granularity",
+                    ),
+                ),
+                ("bucket", models.DateTimeField(verbose_name="Bucket start")),
+                (
+                    "views",
+                    models.IntegerField(default=0, verbose_name="Number of views"),
+                ),
+                (
+                    "property",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="view_rollups",
+                        to="properties.property",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Property views rollup",
+                "verbose_name_plural": "Property Views Rollups",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="propertyviewrollup",
+            index=models.Index(
+                fields=["granularity", "bucket"], name="properties__granula_599a08_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="propertyviewrollup",
+            unique_together={("property", "granularity", "bucket")},
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.1 on 2026-10-17 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0003_propertyviewrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="property",
+            index=models.Index(
+                fields=["-created_at", "-pkid"], name="property_recent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="property",
+            index=models.Index(
+                fields=["user", "-created_at", "-pkid"],
+                name="property_agent_recent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,166 @@
+# Generated by Django 4.1 on 2026-10-17 06:18
+
+import re
+from collections import Counter
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copied from apps.properties.search as it was when this migration was
+# written, so later changes there cannot alter it
+SEARCH_CONFIG = "english"
+
+SEARCH_FIELDS = {
+    "title": 3,
+    "street_address": 2,
+    "description": 1,
+}
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or the to with".split()
+)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return [
+        token[:100]
+        for token in TOKEN_PATTERN.findall((text or "").lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+POSTGRES_FORWARDS = f"""
+CREATE OR REPLACE FUNCTION properties_property_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.street_address, '')), 'B') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_property_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, street_address, description
+ON properties_property
+FOR EACH ROW EXECUTE FUNCTION properties_property_search_vector_update();
+
+UPDATE properties_property SET title = title;
+
+CREATE INDEX properties_property_search_vector_idx
+ON properties_property USING gin (search_vector);
+"""
+
+POSTGRES_BACKWARDS = """
+DROP INDEX IF EXISTS properties_property_search_vector_idx;
+DROP TRIGGER IF EXISTS properties_property_search_vector_trigger ON properties_property;
+DROP FUNCTION IF EXISTS properties_property_search_vector_update();
+"""
+
+
+def build_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_FORWARDS)
+        return
+
+    Property = apps.get_model("properties", "Property")
+    PropertySearchDocument = apps.get_model("properties", "PropertySearchDocument")
+    PropertySearchTerm = apps.get_model("properties", "PropertySearchTerm")
+
+    for property in Property.objects.only("pkid", *SEARCH_FIELDS).iterator():
+        frequencies = Counter()
+        for field, weight in SEARCH_FIELDS.items():
+            for token in tokenize(getattr(property, field)):
+                frequencies[token] += weight
+        document = PropertySearchDocument.objects.create(
+            property_id=property.pkid, length=sum(frequencies.values())
+        )
+        PropertySearchTerm.objects.bulk_create(
+            [
+                PropertySearchTerm(document=document, term=term, frequency=frequency)
+                for term, frequency in frequencies.items()
+            ]
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_BACKWARDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0004_property_recent_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="PropertySearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "length",
+                    models.IntegerField(default=0, verbose_name="Weighted term count"),
+                ),
+                (
+                    "property",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="properties.property",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PropertySearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=100, verbose_name="Term")),
+                (
+                    "frequency",
+                    models.IntegerField(default=0, verbose_name="Weighted frequency"),
+                ),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="terms",
+                        to="properties.propertysearchdocument",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("term", "document")},
+            },
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
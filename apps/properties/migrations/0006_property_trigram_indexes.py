@@ -0,0 +1,56 @@
+# Generated by Django 4.1 on 2026-10-17 06:20
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+TRIGRAM_FIELDS = ["city", "street_address", "postal_code"]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX properties_property_{field}_trgm_idx "
+            f"ON properties_property USING gin ({field} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS properties_property_{field}_trgm_idx"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0005_property_full_text_search"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AlterField(
+            model_name="property",
+            name="city",
+            field=models.CharField(db_index=True, max_length=100, verbose_name="City"),
+        ),
+        migrations.AlterField(
+            model_name="property",
+            name="postal_code",
+            field=models.CharField(
+                db_index=True, max_length=10, verbose_name="Postal code"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="property",
+            name="street_address",
+            field=models.CharField(
+                db_index=True, max_length=150, verbose_name="Street address"
+            ),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
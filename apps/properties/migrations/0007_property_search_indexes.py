@@ -0,0 +1,36 @@
+# Generated by Django 4.1 on 2026-10-17 06:23
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0006_property_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="property",
+            index=models.Index(
+                fields=[
+                    "published_status",
+                    "advert_type",
+                    "property_type",
+                    "price",
+                    "number_of_bedrooms",
+                ],
+                name="property_search_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="property",
+            index=models.Index(
+                django.db.models.functions.text.Upper("advert_type"),
+                django.db.models.functions.text.Upper("property_type"),
+                models.F("price"),
+                name="property_type_ci_idx",
+            ),
+        ),
+    ]
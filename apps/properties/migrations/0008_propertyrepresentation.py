@@ -0,0 +1,35 @@
+# Generated by Django 4.1 on 2026-10-17 06:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0007_property_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PropertyRepresentation",
+            fields=[
+                (
+                    "property",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="representation",
+                        serialize=False,
+                        to="properties.property",
+                    ),
+                ),
+                (
+                    "version",
+                    models.CharField(max_length=32, verbose_name="Serializer version"),
+                ),
+                ("content", models.BinaryField(verbose_name="Encoded JSON")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.1 on 2026-10-17 06:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0008_propertyrepresentation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PropertyTombstone",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("id", models.UUIDField(unique=True, verbose_name="Property ID")),
+                (
+                    "slug",
+                    models.SlugField(max_length=255, verbose_name="Property slug"),
+                ),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="property",
+            index=models.Index(
+                fields=["updated_at", "pkid"], name="property_changes_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="propertytombstone",
+            index=models.Index(
+                fields=["deleted_at", "pkid"], name="property_tombstone_idx"
+            ),
+        ),
+    ]
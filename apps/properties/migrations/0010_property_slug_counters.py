@@ -0,0 +1,65 @@
+# Generated by Django 4.1 on 2026-10-17 06:45
+
+import re
+
+from django.db import migrations, models
+
+SUFFIX_PATTERN = re.compile(r"^(?P<base>.+)-(?P<number>\d+)$")
+
+
+def seed_slug_counters(apps, schema_editor):
+    # Start every base past the slugs autoslug handed out. A title that
+    # slugifies to "<base>-<n>" also counts for <base>, which only skips
+    # numbers.
+    Property = apps.get_model("properties", "Property")
+    PropertySlugCounter = apps.get_model("properties", "PropertySlugCounter")
+
+    counts = {}
+    for slug in Property.objects.values_list("slug", flat=True).iterator():
+        counts[slug] = max(counts.get(slug, 0), 1)
+        match = SUFFIX_PATTERN.match(slug)
+        if match:
+            base = match["base"]
+            counts[base] = max(counts.get(base, 0), int(match["number"]))
+
+    PropertySlugCounter.objects.bulk_create(
+        [PropertySlugCounter(base=base, count=count) for base, count in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0009_property_changes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PropertySlugCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("base", models.SlugField(unique=True, verbose_name="Base slug")),
+                (
+                    "count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Slugs allocated"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="property",
+            name="slug",
+            field=models.SlugField(editable=False, unique=True),
+        ),
+        migrations.RunPython(seed_slug_counters, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,22 @@
 import random
 import string
+from collections import Counter
+from datetime import timedelta
 
-from autoslug import AutoSlugField
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Upper
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
 
-from apps.common.models import TimeStampedUUIDModel
+from apps.common.models import DirtyFieldsMixin, TimeStampedUUIDModel
+
+from .sketches import BloomFilter, HyperLogLog
 
 User = get_user_model()
 
@@ -22,7 +30,23 @@ class PropertyPublishedManager(models.Manager):
         )
 
 
-class Property(TimeStampedUUIDModel):
+SLUG_MAX_LENGTH = 50
+
+
+def get_slug_base(title):
+    return slugify(title)[:SLUG_MAX_LENGTH] or "property"
+
+
+def add_slug_suffix(base, suffix):
+    end = SLUG_MAX_LENGTH - len(suffix) - 1
+    return f"{base[:end].rstrip('-')}-{suffix}"
+
+
+def generate_ref_code():
+    return "".join(random.choices(string.ascii_uppercase + string.digits, k=20))
+
+
+class Property(DirtyFieldsMixin, TimeStampedUUIDModel):
     class PropertyType(models.TextChoices):
         HOUSE = "House", _("House")
         APARTMENT = "Apartment", _("Apartment")
@@ -43,7 +67,7 @@ class Property(TimeStampedUUIDModel):
         on_delete=models.DO_NOTHING,
     )
     title = models.CharField(verbose_name=_("Property title"), max_length=250)
-    slug = AutoSlugField(populate_from="title", unique=True, always_update=True)
+    slug = models.SlugField(max_length=SLUG_MAX_LENGTH, unique=True, editable=False)
     ref_code = models.CharField(
         verbose_name=_("Property Reference Code"),
         max_length=255,
@@ -54,9 +78,13 @@ class Property(TimeStampedUUIDModel):
         verbose_name=_("Description"), default="Default description..."
     )
     country = CountryField(verbose_name=_("Country"), blank_label="Select country")
-    city = models.CharField(verbose_name=_("City"), max_length=100)
-    postal_code = models.CharField(verbose_name=_("Postal code"), max_length=10)
-    street_address = models.CharField(verbose_name=_("Street address"), max_length=150)
+    city = models.CharField(verbose_name=_("City"), max_length=100, db_index=True)
+    postal_code = models.CharField(
+        verbose_name=_("Postal code"), max_length=10, db_index=True
+    )
+    street_address = models.CharField(
+        verbose_name=_("Street address"), max_length=150, db_index=True
+    )
     property_number = models.IntegerField(
         verbose_name=_("Property number"), validators=[MinValueValidator(1)]
     )
@@ -128,6 +156,7 @@ class Property(TimeStampedUUIDModel):
         verbose_name=_("Published status"), default=False
     )
     views = models.IntegerField(verbose_name=_("Number of views"), default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = models.Manager()
     published = PropertyPublishedManager()
@@ -135,16 +164,55 @@ class Property(TimeStampedUUIDModel):
     class Meta:
         verbose_name = "Property"
         verbose_name_plural = "Properties"
+        indexes = [
+            models.Index(fields=["-created_at", "-pkid"], name="property_recent_idx"),
+            models.Index(
+                fields=["user", "-created_at", "-pkid"],
+                name="property_agent_recent_idx",
+            ),
+            # Structured search filters on exact (canonical) choice values
+            models.Index(
+                fields=[
+                    "published_status",
+                    "advert_type",
+                    "property_type",
+                    "price",
+                    "number_of_bedrooms",
+                ],
+                name="property_search_idx",
+            ),
+            # The list filters match advert and property type case-insensitively
+            models.Index(
+                Upper("advert_type"),
+                Upper("property_type"),
+                "price",
+                name="property_type_ci_idx",
+            ),
+            # The change feed seeks on (updated_at, pkid)
+            models.Index(fields=["updated_at", "pkid"], name="property_changes_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
+    def normalize_text(self):
         self.title = str.title(self.title)
         self.description = str.capitalize(self.description)
-        self.ref_code = "".join(
-            random.choices(string.ascii_uppercase + string.digits, k=20)
-        )
+
+    def save(self, *args, **kwargs):
+        self.normalize_text()
+        if self._state.adding or "title" in self.get_dirty_fields():
+            self.ref_code = generate_ref_code()
+            # The slug only moves when the title slugifies differently
+            saved_title = self.get_saved_values().get("title", None)
+            if self._state.adding:
+                allocate_slug = not self.slug
+            else:
+                allocate_slug = saved_title is None or (
+                    get_slug_base(saved_title) != get_slug_base(self.title)
+                )
+            if allocate_slug:
+                (self.slug,) = PropertySlugCounter.objects.allocate([self.title])
         super(Property, self).save(*args, **kwargs)
 
     @property
@@ -168,3 +236,280 @@ class PropertyView(TimeStampedUUIDModel):
     class Meta:
         verbose_name = "Total views on Property"
         verbose_name_plural = "Total Property Views"
+
+
+class PropertyViewSketch(TimeStampedUUIDModel):
+    property = models.OneToOneField(
+        Property, related_name="view_sketch", on_delete=models.CASCADE
+    )
+    unique_viewers = models.IntegerField(
+        verbose_name=_("Estimated unique viewers"), default=0
+    )
+    hyperloglog = models.BinaryField(default=bytes)
+    bloom_filter = models.BinaryField(default=bytes)
+    previous_bloom_filter = models.BinaryField(default=bytes)
+    bloom_rotated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"About {self.unique_viewers} unique viewers on {self.property.title}"
+
+    class Meta:
+        verbose_name = "Property view sketch"
+        verbose_name_plural = "Property View Sketches"
+
+    def record(self, viewer_ips, capacity, error_rate, rotate_after):
+        """
+        Add viewer IPs to the sketch and return how many of them had not
+        been seen before. Dedupe checks both the current and the previous
+        Bloom filter, so rotation never forgets the most recent viewers.
+        """
+        hyperloglog = HyperLogLog.from_bytes(bytes(self.hyperloglog))
+        current = (
+            BloomFilter.from_bytes(bytes(self.bloom_filter))
+            if self.bloom_filter
+            else BloomFilter.for_capacity(capacity, error_rate)
+        )
+        previous = (
+            BloomFilter.from_bytes(bytes(self.previous_bloom_filter))
+            if self.previous_bloom_filter
+            else None
+        )
+
+        new_viewers = 0
+        for viewer_ip in viewer_ips:
+            hyperloglog.add(viewer_ip)
+            if viewer_ip in current:
+                continue
+            if previous is None or viewer_ip not in previous:
+                new_viewers += 1
+
+            if current.items >= capacity or (
+                timezone.now() - self.bloom_rotated_at >= rotate_after
+            ):
+                previous = current
+                current = BloomFilter.for_capacity(capacity, error_rate)
+                self.bloom_rotated_at = timezone.now()
+            current.add(viewer_ip)
+
+        self.hyperloglog = hyperloglog.to_bytes()
+        self.bloom_filter = current.to_bytes()
+        self.previous_bloom_filter = previous.to_bytes() if previous else b""
+        self.unique_viewers = hyperloglog.count()
+        return new_viewers
+
+
+class PropertyViewRollupManager(models.Manager):
+    def get_buckets(self, timestamp):
+        """The start of the hourly and daily buckets that contain ``timestamp``."""
+        timestamp = timezone.localtime(timestamp)
+        return {
+            PropertyViewRollup.Granularity.HOUR: timestamp.replace(
+                minute=0, second=0, microsecond=0
+            ),
+            PropertyViewRollup.Granularity.DAY: timestamp.replace(
+                hour=0, minute=0, second=0, microsecond=0
+            ),
+        }
+
+    def record(self, counts, timestamp=None):
+        """
+        Add per-property view counts to the hourly and daily buckets that
+        contain ``timestamp``.
+        """
+        if not counts:
+            return
+
+        buckets = self.get_buckets(timestamp or timezone.now())
+        self.bulk_create(
+            [
+                self.model(property_id=pkid, granularity=granularity, bucket=bucket)
+                for granularity, bucket in buckets.items()
+                for pkid in counts
+            ],
+            ignore_conflicts=True,
+        )
+        for granularity, bucket in buckets.items():
+            for pkid, count in counts.items():
+                self.filter(
+                    property_id=pkid, granularity=granularity, bucket=bucket
+                ).update(views=models.F("views") + count)
+
+    def rebuild(self, since):
+        """
+        Recompute every bucket that starts at or after ``since`` from the raw
+        PropertyView rows, which exact view counting keeps one of per counted
+        view. Returns the number of buckets written.
+        """
+        starts = self.get_buckets(since)
+        for granularity, delta in (
+            (PropertyViewRollup.Granularity.HOUR, timedelta(hours=1)),
+            (PropertyViewRollup.Granularity.DAY, timedelta(days=1)),
+        ):
+            # Only buckets the raw rows cover in full
+            if starts[granularity] < since:
+                starts[granularity] = self.get_buckets(since + delta)[granularity]
+
+        counts = Counter()
+        views = PropertyView.objects.filter(
+            created_at__gte=min(starts.values())
+        ).values_list("property_id", "created_at")
+        for property_id, created_at in views.iterator(chunk_size=2000):
+            for granularity, bucket in self.get_buckets(created_at).items():
+                if bucket >= starts[granularity]:
+                    counts[(property_id, granularity, bucket)] += 1
+
+        with transaction.atomic():
+            for granularity, start in starts.items():
+                self.filter(granularity=granularity, bucket__gte=start).delete()
+            self.bulk_create(
+                [
+                    self.model(
+                        property_id=property_id,
+                        granularity=granularity,
+                        bucket=bucket,
+                        views=count,
+                    )
+                    for (property_id, granularity, bucket), count in counts.items()
+                ],
+                batch_size=2000,
+            )
+        return len(counts)
+
+
+class PropertyViewRollup(TimeStampedUUIDModel):
+    class Granularity(models.TextChoices):
+        HOUR = "hour", _("Hour")
+        DAY = "day", _("Day")
+
+    property = models.ForeignKey(
+        Property, related_name="view_rollups", on_delete=models.CASCADE
+    )
+    granularity = models.CharField(
+        verbose_name=_("Granularity"), max_length=10, choices=Granularity.choices
+    )
+    bucket = models.DateTimeField(verbose_name=_("Bucket start"))
+    views = models.IntegerField(verbose_name=_("Number of views"), default=0)
+
+    objects = PropertyViewRollupManager()
+
+    def __str__(self):
+        return f"{self.views} views on {self.property.title} for {self.granularity} {self.bucket}"
+
+    class Meta:
+        verbose_name = "Property views rollup"
+        verbose_name_plural = "Property Views Rollups"
+        unique_together = ["property", "granularity", "bucket"]
+        indexes = [models.Index(fields=["granularity", "bucket"])]
+
+
+class PropertySearchDocument(models.Model):
+    """Per-property entry of the built-in full-text index used off PostgreSQL."""
+
+    property = models.OneToOneField(
+        Property, related_name="search_document", on_delete=models.CASCADE
+    )
+    length = models.IntegerField(verbose_name=_("Weighted term count"), default=0)
+
+    def __str__(self):
+        return f"Search document for {self.property.title}"
+
+
+class PropertySearchTerm(models.Model):
+    document = models.ForeignKey(
+        PropertySearchDocument, related_name="terms", on_delete=models.CASCADE
+    )
+    term = models.CharField(verbose_name=_("Term"), max_length=100)
+    frequency = models.IntegerField(verbose_name=_("Weighted frequency"), default=0)
+
+    def __str__(self):
+        return self.term
+
+    class Meta:
+        unique_together = ["term", "document"]
+
+
+class PropertyRepresentation(models.Model):
+    """Pre-encoded public JSON of a property, kept when materialisation is on."""
+
+    property = models.OneToOneField(
+        Property,
+        related_name="representation",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    version = models.CharField(verbose_name=_("Serializer version"), max_length=32)
+    content = models.BinaryField(verbose_name=_("Encoded JSON"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Representation of {self.property.title}"
+
+
+class PropertyTombstone(models.Model):
+    """Left behind by a deleted property so the change feed can report it."""
+
+    pkid = models.BigAutoField(primary_key=True, editable=False)
+    id = models.UUIDField(verbose_name=_("Property ID"), unique=True)
+    slug = models.SlugField(verbose_name=_("Property slug"), max_length=255)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["deleted_at", "pkid"], name="property_tombstone_idx")
+        ]
+
+    def __str__(self):
+        return f"Deleted property {self.slug}"
+
+
+class PropertySlugCounterManager(models.Manager):
+    def allocate(self, titles):
+        """
+        A unique slug for each of ``titles``. The first property with a base
+        slug gets it as is and later ones "<base>-<n>", numbered by a counter
+        row per base that is incremented in place, which serialises
+        concurrent allocations. This costs a fixed number of queries per
+        distinct base. A slug that is taken anyway, e.g. by a title that
+        slugifies to "<base>-<n>" itself, gets a random suffix instead.
+        """
+        bases = [get_slug_base(title) for title in titles]
+        wanted = Counter(bases)
+        self.bulk_create(
+            [self.model(base=base) for base in wanted], ignore_conflicts=True
+        )
+        with transaction.atomic():
+            for base, count in wanted.items():
+                self.filter(base=base).update(count=models.F("count") + count)
+            counts = dict(self.filter(base__in=wanted).values_list("base", "count"))
+
+        numbers = {base: counts[base] - count for base, count in wanted.items()}
+        slugs = []
+        for base in bases:
+            numbers[base] += 1
+            number = numbers[base]
+            slugs.append(base if number == 1 else add_slug_suffix(base, str(number)))
+
+        taken = set(
+            Property.objects.filter(slug__in=slugs).values_list("slug", flat=True)
+        )
+        for position, (base, slug) in enumerate(zip(bases, slugs)):
+            if slug in taken:
+                suffix = get_random_string(6, string.ascii_lowercase + string.digits)
+                slug = add_slug_suffix(base, suffix)
+            taken.add(slug)
+            slugs[position] = slug
+        return slugs
+
+
+class PropertySlugCounter(models.Model):
+    """How many properties have been given each base slug."""
+
+    base = models.SlugField(
+        verbose_name=_("Base slug"), max_length=SLUG_MAX_LENGTH, unique=True
+    )
+    count = models.PositiveIntegerField(verbose_name=_("Slugs allocated"), default=0)
+
+    objects = PropertySlugCounterManager()
+
+    def __str__(self):
+        return f"{self.base} ({self.count})"
@@ -1,5 +1,365 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class PropertyPagination(PageNumberPagination):
     page_size = 10
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on the queryset ordering plus ``pkid`` as a
+    tie-breaker, e.g. ``WHERE (created_at, pkid) < (:created_at, :pkid)``,
+    so every page costs the same regardless of depth and no COUNT(*) runs.
+    The cursor is an opaque token holding the boundary row's values.
+    """
+
+    page_size = 10
+    max_results = None
+    cursor_query_param = "cursor"
+    default_ordering = ("-created_at",)
+    tie_breaker = "pkid"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        self.next_values = self.previous_values = None
+        queryset = self.load_ordering_fields(queryset)
+
+        cursor = self.decode_cursor(request, queryset)
+        values, reverse, position = cursor or (None, False, 0)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_seek_filter(values, reverse))
+
+        page_size = self.get_page_size(request)
+        if self.max_results is not None and not reverse:
+            page_size = max(0, min(page_size, self.max_results - position))
+
+        queryset = queryset.order_by(
+            *[
+                f"{'-' if descending != reverse else ''}{name}"
+                for name, descending in self.ordering
+            ]
+        )
+        rows = list(queryset[: page_size + 1]) if page_size else []
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.start = max(0, position - len(rows)) if reverse else position
+        self.end = self.start + len(rows)
+        within_window = self.max_results is None or self.end < self.max_results
+        if rows:
+            if (has_more or reverse) and within_window:
+                self.next_values = self.get_row_values(rows[-1])
+            if cursor is not None and (has_more or not reverse):
+                self.previous_values = self.get_row_values(rows[0])
+        return rows
+
+    def get_page_size(self, request):
+        return self.page_size
+
+    def get_page_state(self):
+        """What get_paginated_response() needs, so a cached page can be served."""
+        return {
+            "ordering": self.ordering,
+            "next_values": self.next_values,
+            "previous_values": self.previous_values,
+            "start": self.start,
+            "end": self.end,
+        }
+
+    def set_page_state(self, request, state):
+        self.request = request
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def get_ordering(self, queryset):
+        ordering = [
+            (name.lstrip("-"), name.startswith("-"))
+            for name in (queryset.query.order_by or self.default_ordering)
+        ]
+        if not any(name in (self.tie_breaker, "pk") for name, _ in ordering):
+            ordering.append((self.tie_breaker, ordering[0][1]))
+        return ordering
+
+    def get_ordering_fields(self, queryset):
+        return [name for name, _ in self.get_ordering(queryset)]
+
+    def load_ordering_fields(self, queryset):
+        # Cursors are built from the boundary rows, so a projection made
+        # with only() must also load the ordering fields
+        field_names, defer = queryset.query.deferred_loading
+        if not field_names or defer:
+            return queryset
+        ordering_fields = [
+            name for name, _ in self.ordering if name not in queryset.query.annotations
+        ]
+        return queryset.only(*field_names, *ordering_fields)
+
+    def get_row_values(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.ordering]
+        return [getattr(row, name) for name, _ in self.ordering]
+
+    def get_seek_filter(self, values, reverse):
+        conditions = []
+        for position, (name, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending != reverse else "gt"
+            condition = Q(**{f"{name}__{lookup}": values[position]})
+            for previous, (previous_name, _) in enumerate(self.ordering[:position]):
+                condition &= Q(**{previous_name: values[previous]})
+            conditions.append(condition)
+        return reduce(lambda left, right: left | right, conditions)
+
+    def encode_cursor(self, values, reverse, position):
+        payload = {
+            "o": [name for name, _ in self.ordering],
+            "v": [self.encode_value(value) for value in values],
+            "r": reverse,
+            "p": position,
+        }
+        token = urlsafe_b64encode(json.dumps(payload).encode("ascii")).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token.rstrip("="))
+
+    def get_cursor_token(self, request):
+        return request.query_params.get(self.cursor_query_param)
+
+    def get_ordering_field(self, queryset, name):
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        if name == "pk":
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(name)
+
+    def decode_cursor(self, request, queryset):
+        token = self.get_cursor_token(request)
+        if not token:
+            return None
+
+        try:
+            padding = "=" * (-len(token) % 4)
+            payload = json.loads(urlsafe_b64decode(token + padding))
+            if payload["o"] != [name for name, _ in self.ordering]:
+                raise ValueError("Cursor does not match the requested ordering")
+            if len(payload["v"]) != len(self.ordering):
+                raise ValueError("Cursor does not hold a value per ordering field")
+            values = [
+                self.get_ordering_field(queryset, name).to_python(
+                    self.decode_value(value)
+                )
+                for (name, _), value in zip(self.ordering, payload["v"])
+            ]
+            if None in values:
+                raise ValueError("Cursors cannot seek past null values")
+            return values, bool(payload["r"]), max(0, int(payload.get("p", 0)))
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            InvalidOperation,
+            DjangoValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_value(value):
+        if isinstance(value, datetime):
+            return {"datetime": value.isoformat()}
+        if isinstance(value, Decimal):
+            return {"decimal": str(value)}
+        return value
+
+    @staticmethod
+    def decode_value(value):
+        if isinstance(value, dict):
+            if "datetime" in value:
+                parsed = parse_datetime(value["datetime"])
+                if parsed is None:
+                    raise ValueError(value)
+                return parsed
+            return Decimal(value["decimal"])
+        return value
+
+    def get_next_link(self):
+        if self.next_values is None:
+            return None
+        return self.encode_cursor(self.next_values, reverse=False, position=self.end)
+
+    def get_previous_link(self):
+        if self.previous_values is None:
+            return None
+        return self.encode_cursor(
+            self.previous_values, reverse=True, position=self.start
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class PropertyCursorPagination(KeysetPagination):
+    page_size = 10
+
+
+class PropertySearchPagination(KeysetPagination):
+    """
+    Keyset pagination for PropertySearchAPIView. Results stop after
+    PROPERTY_SEARCH_MAX_RESULTS rows, and the total is counted exactly,
+    estimated, or omitted depending on the ``count`` criterion.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    count_param = "count"
+    count_modes = ["exact", "estimated", "none"]
+
+    def __init__(self):
+        self.max_results = settings.PROPERTY_SEARCH_MAX_RESULTS
+
+    def get_param(self, request, name):
+        if name in request.query_params:
+            return request.query_params[name]
+        if hasattr(request.data, "get"):
+            return request.data.get(name, None)
+        return None
+
+    def get_cursor_token(self, request):
+        return self.get_param(request, self.cursor_query_param)
+
+    def get_page_size(self, request):
+        page_size = self.get_param(request, self.page_size_query_param)
+        if page_size is None:
+            return self.page_size
+        try:
+            page_size = int(page_size)
+        except (TypeError, ValueError):
+            raise ValidationError({self.page_size_query_param: "Must be an integer"})
+        return max(1, min(page_size, settings.PROPERTY_SEARCH_MAX_PAGE_SIZE))
+
+    def get_count_mode(self, request):
+        count_mode = (
+            self.get_param(request, self.count_param)
+            or settings.PROPERTY_SEARCH_COUNT_MODE
+        )
+        if count_mode not in self.count_modes:
+            raise ValidationError(
+                {self.count_param: f"Must be one of {', '.join(self.count_modes)}"}
+            )
+        return count_mode
+
+    def get_page_params(self, request):
+        """The validated parameters, besides the filters, that pick a page."""
+        return {
+            "cursor": self.get_cursor_token(request),
+            "page_size": self.get_page_size(request),
+            "count_mode": self.get_count_mode(request),
+        }
+
+    def get_page_state(self):
+        state = super().get_page_state()
+        state.update(count=self.count, count_mode=self.count_mode)
+        return state
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == "exact":
+            self.count = queryset.count()
+        elif self.count_mode == "estimated":
+            self.count = self.estimate_count(queryset)
+        else:
+            self.count = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def estimate_count(self, queryset):
+        """
+        Use the planner's row estimate on PostgreSQL. Elsewhere count at
+        most ``max_results + 1`` rows, which is all a client can page to.
+        """
+        if connections[queryset.db].vendor == "postgresql":
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        return queryset.order_by()[: self.max_results + 1].count()
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("count_mode", self.count_mode),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class PropertyListPagination(BasePagination):
+    """
+    Page number pagination by default for backward compatibility, keyset
+    pagination when the client asks for ``?pagination=cursor`` (or sends a
+    cursor) or when PROPERTY_PAGINATION_MODE is "cursor".
+    """
+
+    mode_query_param = "pagination"
+
+    def __init__(self):
+        self.page_paginator = PropertyPagination()
+        self.cursor_paginator = PropertyCursorPagination()
+        self.paginator = self.page_paginator
+
+    def get_mode(self, request):
+        if self.cursor_paginator.cursor_query_param in request.query_params:
+            return "cursor"
+        return request.query_params.get(
+            self.mode_query_param, settings.PROPERTY_PAGINATION_MODE
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.get_mode(request) == "cursor":
+            self.paginator = self.cursor_paginator
+        else:
+            self.paginator = self.page_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_ordering_fields(self, queryset):
+        return self.cursor_paginator.get_ordering_fields(queryset)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
@@ -0,0 +1,153 @@
+import hashlib
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.settings import api_settings
+
+from apps.common.serializers import CompiledSerializer, get_field_selection
+
+from .models import Property, PropertyRepresentation
+from .serializers import PropertySerializer
+
+# Image URLs are stored relative to the site with this marker in front, and
+# the marker is swapped for the request's scheme and host when served
+URL_MARKER = "\x00"
+RESULTS_MARKER = "\x00results\x00"
+
+# Representations are encoded with the default renderer and only served
+# to requests that negotiated it
+renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+ENCODED_URL_MARKER = renderer.render(URL_MARKER).rstrip(b'"')
+ENCODED_RESULTS_MARKER = renderer.render(RESULTS_MARKER)
+
+
+class RepresentationRequest:
+    """Stands in for the request while a representation is rendered."""
+
+    def build_absolute_uri(self, location):
+        if urlsplit(location).netloc:
+            return location
+        return URL_MARKER + location
+
+
+def accepts_representation(request):
+    """
+    Whether a pre-encoded representation answers ``request``: they hold
+    every field and are encoded with the default renderer.
+    """
+    return type(request.accepted_renderer) is type(renderer) and not (
+        get_field_selection(request.query_params)
+    )
+
+
+def is_materialized(request=None):
+    """
+    Whether stored representations are in use, and can answer ``request``.
+    """
+    if not settings.PROPERTY_MATERIALIZED_JSON:
+        return False
+    return request is None or accepts_representation(request)
+
+
+@lru_cache(maxsize=None)
+def get_version():
+    # Changes whenever the serializer gains, loses or reorders a field, or
+    # the renderer changes
+    fields = ",".join(PropertySerializer().fields)
+    renderer_class = type(renderer)
+    version = f"{renderer_class.__module__}.{renderer_class.__name__}:{fields}"
+    return hashlib.md5(version.encode("utf-8")).hexdigest()
+
+
+def render_representations(pkids):
+    compiled = CompiledSerializer(
+        PropertySerializer, context={"request": RepresentationRequest()}
+    )
+    rows = list(compiled.values(Property.objects.filter(pkid__in=pkids), ["pkid"]))
+    data = compiled.to_representation(rows)
+    return {row.pkid: renderer.render(item) for row, item in zip(rows, data)}
+
+
+def refresh_representations(pkids):
+    """Re-render and store the representations of the given properties."""
+    contents = render_representations(list(pkids))
+    version = get_version()
+    PropertyRepresentation.objects.bulk_create(
+        [
+            PropertyRepresentation(property_id=pkid, version=version, content=content)
+            for pkid, content in contents.items()
+        ],
+        update_conflicts=True,
+        # Django 4.1 writes unique_fields into ON CONFLICT as given
+        unique_fields=["property_id"],
+        update_fields=["version", "content", "updated_at"],
+    )
+    return contents
+
+
+def rebuild_representations(batch_size=500):
+    refreshed = 0
+    pkids = Property.objects.order_by("pkid").values_list("pkid", flat=True)
+    batch = []
+    for pkid in pkids.iterator(chunk_size=batch_size):
+        batch.append(pkid)
+        if len(batch) >= batch_size:
+            refreshed += len(refresh_representations(batch))
+            batch = []
+    if batch:
+        refreshed += len(refresh_representations(batch))
+    PropertyRepresentation.objects.exclude(version=get_version()).delete()
+    return refreshed
+
+
+def representation_values(queryset, extra_fields=()):
+    """``queryset`` as named rows carrying each stored representation."""
+    names = ["pkid", "representation__version", "representation__content"]
+    names += [name for name in extra_fields if name not in names]
+    return queryset.values_list(*names, named=True)
+
+
+def get_contents(rows):
+    """
+    Encoded representations for ``rows`` from representation_values(),
+    rendering and storing any that are missing or out of date.
+    """
+    version = get_version()
+    contents = {
+        row.pkid: bytes(row.representation__content)
+        for row in rows
+        if row.representation__version == version
+    }
+    stale = [row.pkid for row in rows if row.pkid not in contents]
+    if stale:
+        contents.update(refresh_representations(stale))
+    return [contents[row.pkid] for row in rows if row.pkid in contents]
+
+
+def expand_urls(content, request=None):
+    origin = request.build_absolute_uri("/").rstrip("/") if request else ""
+    return content.replace(ENCODED_URL_MARKER, b'"' + origin.encode("utf-8"))
+
+
+def render_response(response, request, contents, absolute_urls=True):
+    """
+    Render a DRF ``response`` whose data holds RESULTS_MARKER in place of
+    the results, splicing in the pre-encoded ``contents``.
+    """
+    rendered = request.accepted_renderer.render(
+        response.data, request.accepted_media_type, {"request": request}
+    )
+    results = b"[" + b",".join(contents) + b"]"
+    content = expand_urls(
+        rendered.replace(ENCODED_RESULTS_MARKER, results, 1),
+        request if absolute_urls else None,
+    )
+    return HttpResponse(
+        content, status=response.status_code, content_type=renderer.media_type
+    )
+
+
+def render_content_response(content, request):
+    return HttpResponse(expand_urls(content, request), content_type=renderer.media_type)
@@ -0,0 +1,227 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Avg, Case, Count, F, FloatField, Value, When
+from django.db.models.functions import Cast
+
+from .models import Property, PropertySearchDocument, PropertySearchTerm
+
+SEARCH_CONFIG = "english"
+
+# Field weights, mirrored by the A/B/C weights of the PostgreSQL trigger
+SEARCH_FIELDS = {
+    "title": 3,
+    "street_address": 2,
+    "description": 1,
+}
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or the to with".split()
+)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return [
+        token[:100]
+        for token in TOKEN_PATTERN.findall((text or "").lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def uses_postgres_search(using="default"):
+    return connections[using].vendor == "postgresql"
+
+
+class PostgresSearchBackend:
+    """
+    Matches against the ``search_vector`` column, which a trigger keeps in
+    sync and a GIN index serves, and ranks with ts_rank_cd normalised by
+    document length.
+    """
+
+    def search(self, queryset, query, limit=None):
+        # Not sliced to ``limit``: pagination seeks further into the results,
+        # which a sliced queryset cannot take, and stops at the limit itself
+        search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(
+                # ts_rank_cd returns a real; cast it so the rank round-trips
+                # exactly through pagination cursors
+                rank=Cast(
+                    SearchRank(
+                        F("search_vector"),
+                        search_query,
+                        normalization=Value(1),
+                        cover_density=True,
+                    ),
+                    FloatField(),
+                )
+            )
+            .order_by("-rank")
+        )
+
+    def index(self, properties):
+        # The search_vector column is maintained by a database trigger
+        pass
+
+
+class InvertedIndexSearchBackend:
+    """
+    Term -> property postings stored in PropertySearchTerm, scored with
+    BM25. Given a ``limit``, only the best matches are returned, ranked in
+    Python rather than with an unbounded CASE over every match.
+    """
+
+    k1 = 1.2
+    b = 0.75
+    stats_cache_key = "properties:search:stats"
+
+    def search(self, queryset, query, limit=None):
+        terms = set(tokenize(query))
+        if not terms:
+            return queryset.none()
+
+        postings = PropertySearchTerm.objects.filter(
+            term__in=terms, document__property__in=queryset.values("pkid")
+        ).values_list("document__property_id", "term", "frequency", "document__length")
+        document_frequencies = dict(
+            PropertySearchTerm.objects.filter(term__in=terms)
+            .values("term")
+            .annotate(count=Count("pk"))
+            .values_list("term", "count")
+        )
+        total_documents, average_length = self.get_stats()
+
+        # Every term must match, like websearch_to_tsquery on PostgreSQL
+        scores = defaultdict(float)
+        matched_terms = Counter()
+        for pkid, term, frequency, length in postings:
+            matched_terms[pkid] += 1
+            document_frequency = document_frequencies.get(term, 0)
+            idf = math.log(
+                1
+                + (total_documents - document_frequency + 0.5)
+                / (document_frequency + 0.5)
+            )
+            norm = self.k1 * (1 - self.b + self.b * length / average_length)
+            scores[pkid] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        ranked = sorted(
+            (
+                (pkid, score)
+                for pkid, score in scores.items()
+                if matched_terms[pkid] == len(terms)
+            ),
+            key=lambda item: (-item[1], -item[0]),
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        if not ranked:
+            return queryset.none()
+
+        return (
+            queryset.filter(pkid__in=[pkid for pkid, _ in ranked])
+            .annotate(
+                rank=Case(
+                    *[When(pkid=pkid, then=Value(score)) for pkid, score in ranked],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-rank")
+        )
+
+    def get_stats(self):
+        stats = cache.get(self.stats_cache_key)
+        if stats is None:
+            aggregate = PropertySearchDocument.objects.aggregate(
+                total=Count("pk"), average_length=Avg("length")
+            )
+            stats = (aggregate["total"], aggregate["average_length"] or 1.0)
+            cache.set(self.stats_cache_key, stats, 300)
+        return stats
+
+    def index(self, properties):
+        properties = list(properties)
+        if not properties:
+            return
+
+        documents = []
+        postings = []
+        for property in properties:
+            frequencies = Counter()
+            for field, weight in SEARCH_FIELDS.items():
+                for token in tokenize(getattr(property, field)):
+                    frequencies[token] += weight
+            documents.append(
+                PropertySearchDocument(
+                    property_id=property.pkid, length=sum(frequencies.values())
+                )
+            )
+            postings.append((property.pkid, frequencies))
+
+        pkids = [property.pkid for property in properties]
+        with transaction.atomic():
+            PropertySearchDocument.objects.filter(property_id__in=pkids).delete()
+            PropertySearchDocument.objects.bulk_create(documents)
+            document_ids = dict(
+                PropertySearchDocument.objects.filter(
+                    property_id__in=pkids
+                ).values_list("property_id", "pk")
+            )
+            PropertySearchTerm.objects.bulk_create(
+                [
+                    PropertySearchTerm(
+                        document_id=document_ids[pkid],
+                        term=term,
+                        frequency=frequency,
+                    )
+                    for pkid, frequencies in postings
+                    for term, frequency in frequencies.items()
+                ],
+                batch_size=1000,
+            )
+
+
+def get_search_backend(using="default"):
+    if uses_postgres_search(using):
+        return PostgresSearchBackend()
+    return InvertedIndexSearchBackend()
+
+
+def search_properties(queryset, query, limit=None):
+    """
+    Filter ``queryset`` down to properties matching the full-text ``query``,
+    annotated with a relevance ``rank`` and ordered by it. Backends may cut
+    the matches to the best ``limit``, so filter ``queryset`` first.
+    """
+    return get_search_backend(queryset.db).search(queryset, query, limit=limit)
+
+
+def index_properties(properties, using="default"):
+    get_search_backend(using).index(properties)
+
+
+def rebuild_search_index(batch_size=1000, using="default"):
+    backend = get_search_backend(using)
+    if isinstance(backend, PostgresSearchBackend):
+        Property.objects.using(using).update(title=F("title"))
+        return Property.objects.using(using).count()
+
+    indexed = 0
+    queryset = Property.objects.using(using).only("pkid", *SEARCH_FIELDS)
+    batch = []
+    for property in queryset.iterator(chunk_size=batch_size):
+        batch.append(property)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            indexed += len(batch)
+            batch = []
+    backend.index(batch)
+    return indexed + len(batch)
@@ -2,10 +2,14 @@ from django_countries.serializer_fields import CountryField
 from django_countries.serializers import CountryFieldMixin
 from rest_framework import serializers
 
-from .models import Property, PropertyView
+from apps.common.serializers import ProjectionMixin, SparseFieldsMixin
 
+from .models import Property, PropertyTombstone
 
-class PropertySerializer(serializers.ModelSerializer):
+
+class PropertySerializer(
+    SparseFieldsMixin, ProjectionMixin, serializers.ModelSerializer
+):
     user = serializers.SerializerMethodField()
     country = CountryField(name_only=True)
 
@@ -40,6 +44,10 @@ class PropertySerializer(serializers.ModelSerializer):
             "published_status",
             "views",
         ]
+        field_dependencies = {
+            "user": ["user__username"],
+            "final_property_price": ["price", "tax"],
+        }
 
     def get_user(seld, obj):
         return obj.user.username
@@ -53,13 +61,54 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
         exclude = [
             "pkid",
             "updated_at",
+            "search_vector",
         ]
 
 
-class PropertyViewSerializer(serializers.ModelSerializer):
+class PropertyImportSerializer(serializers.ModelSerializer):
+    """
+    One row of a bulk import. Slugs and reference codes are allocated by
+    the import, the agent is the importing user, and images are left at
+    their defaults.
+    """
+
+    country = CountryField(name_only=True)
+
     class Meta:
-        model = PropertyView
-        exclude = [
-            "pkid",
-            "updated_at",
+        model = Property
+        fields = [
+            "title",
+            "description",
+            "country",
+            "city",
+            "postal_code",
+            "street_address",
+            "property_number",
+            "price",
+            "tax",
+            "plot_area",
+            "number_of_floors",
+            "number_of_bedrooms",
+            "number_of_bathrooms",
+            "property_type",
+            "advert_type",
+            "published_status",
         ]
+
+
+class PropertyAutocompleteSerializer(serializers.Serializer):
+    kind = serializers.CharField()
+    value = serializers.CharField()
+    label = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class PropertyViewsBucketSerializer(serializers.Serializer):
+    bucket = serializers.DateTimeField()
+    views = serializers.IntegerField()
+
+
+class PropertyTombstoneSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PropertyTombstone
+        fields = ["id", "slug", "deleted_at"]
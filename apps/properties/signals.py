@@ -0,0 +1,146 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from apps.properties.caching import (
+    invalidate_property_details,
+    invalidate_property_lists,
+    set_detail_version,
+)
+from apps.properties.locality import autocomplete_index, locality_index
+from apps.properties.models import Property, PropertyTombstone
+from apps.properties.representations import is_materialized, refresh_representations
+from apps.properties.search import SEARCH_FIELDS, index_properties
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Sent with the properties inserted by imports.create_properties(), as
+# bulk_create() sends no post_save
+properties_bulk_created = Signal()
+
+
+# Property.save() only writes the changed columns, and post_save receivers
+# compare get_saved_values(), still as they were before the save, with the
+# new field values
+
+
+@receiver(post_save, sender=Property)
+def update_property_search_index(sender, instance, using, update_fields, **kwargs):
+    if update_fields is not None and not update_fields & set(SEARCH_FIELDS):
+        return
+    index_properties([instance], using=using)
+
+
+@receiver(post_save, sender=Property)
+def update_in_memory_indexes(sender, instance, created, **kwargs):
+    for index in (locality_index, autocomplete_index):
+        index.change(
+            instance.get_saved_values(), instance.get_field_values(), created=created
+        )
+
+
+@receiver(post_delete, sender=Property)
+def remove_from_in_memory_indexes(sender, instance, **kwargs):
+    for index in (locality_index, autocomplete_index):
+        index.remove(instance.get_field_values())
+
+
+@receiver(post_save, sender=Property)
+def refresh_property_representation(sender, instance, **kwargs):
+    if is_materialized():
+        refresh_representations([instance.pkid])
+
+
+@receiver(post_save, sender=Property)
+def invalidate_cached_lists_on_save(sender, instance, **kwargs):
+    # A property moved to another agent leaves its old agent's lists stale
+    invalidate_property_lists(
+        {instance.get_saved_values().get("user_id", None), instance.user_id},
+        published=bool(
+            instance.published_status
+            or instance.get_saved_values().get("published_status", False)
+        ),
+    )
+
+
+@receiver(post_delete, sender=Property)
+def invalidate_cached_lists_on_delete(sender, instance, **kwargs):
+    invalidate_property_lists([instance.user_id], published=instance.published_status)
+
+
+@receiver(post_save, sender=Property)
+def update_cached_detail_version(sender, instance, **kwargs):
+    old_slug = instance.get_saved_values().get("slug", None)
+    if old_slug and old_slug != instance.slug:
+        invalidate_property_details([old_slug], delete=True)
+    set_detail_version(instance)
+
+
+@receiver(post_delete, sender=Property)
+def leave_property_tombstone(sender, instance, **kwargs):
+    PropertyTombstone.objects.create(id=instance.id, slug=instance.slug)
+
+
+@receiver(post_delete, sender=Property)
+def invalidate_cached_detail(sender, instance, **kwargs):
+    invalidate_property_details([instance.slug], delete=True)
+
+
+@receiver(properties_bulk_created)
+def index_bulk_created_properties(sender, instances, using, **kwargs):
+    index_properties(instances, using=using)
+
+
+@receiver(properties_bulk_created)
+def add_bulk_created_to_in_memory_indexes(sender, instances, **kwargs):
+    for index in (locality_index, autocomplete_index):
+        for instance in instances:
+            index.add(instance.get_field_values())
+
+
+@receiver(properties_bulk_created)
+def refresh_bulk_created_representations(sender, instances, **kwargs):
+    if is_materialized():
+        refresh_representations([instance.pkid for instance in instances])
+
+
+@receiver(properties_bulk_created)
+def invalidate_cached_lists_on_bulk_create(sender, instances, **kwargs):
+    invalidate_property_lists(
+        {instance.user_id for instance in instances},
+        published=any(instance.published_status for instance in instances),
+    )
+
+
+@receiver(post_save, sender=User)
+def refresh_agent_properties(sender, instance, created, update_fields, **kwargs):
+    # Representations, list pages and details include the agent's username
+    if created:
+        return
+    if update_fields is not None and "username" not in update_fields:
+        return
+    properties = Property.objects.filter(user=instance).values_list(
+        "pkid", "slug", "published_status", named=True
+    )
+    invalidate_property_lists(
+        [instance.pkid], published=any(row.published_status for row in properties)
+    )
+    invalidate_property_details([row.slug for row in properties])
+    if is_materialized():
+        refresh_representations([row.pkid for row in properties])
+
+
+@receiver(connection_created)
+def set_trigram_similarity_threshold(sender, connection, **kwargs):
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SET pg_trgm.similarity_threshold = %s",
+                [settings.PROPERTY_FUZZY_MATCH_THRESHOLD],
+            )
@@ -0,0 +1,105 @@
+import hashlib
+import math
+import struct
+
+
+def _hash64(value, salt=b""):
+    digest = hashlib.blake2b(
+        value.encode("utf-8"), digest_size=8, person=salt.ljust(16, b"\0")
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HyperLogLog:
+    """
+    Cardinality estimator with 2 ** precision one-byte registers. The
+    standard error is roughly 1.04 / sqrt(2 ** precision), about 1.6% for
+    the default precision of 12 (4 KiB per sketch).
+    """
+
+    HEADER = struct.Struct(">B")
+
+    def __init__(self, precision=12, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.size)
+
+    @classmethod
+    def from_bytes(cls, data, precision=12):
+        if not data:
+            return cls(precision)
+        (precision,) = cls.HEADER.unpack_from(data)
+        offset = cls.HEADER.size
+        return cls(precision, bytearray(data[offset:]))
+
+    def to_bytes(self):
+        return self.HEADER.pack(self.precision) + bytes(self.registers)
+
+    def add(self, value):
+        hashed = _hash64(value, b"hll")
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size**2 / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for ``capacity`` items at the given false
+    positive rate. ``items`` counts insertions so callers can rotate the
+    filter before it saturates.
+    """
+
+    HEADER = struct.Struct(">IBI")
+
+    def __init__(self, num_bits, num_hashes, bits=None, items=0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.items = items
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=0.01):
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    @classmethod
+    def from_bytes(cls, data):
+        num_bits, num_hashes, items = cls.HEADER.unpack_from(data)
+        offset = cls.HEADER.size
+        return cls(num_bits, num_hashes, bytearray(data[offset:]), items)
+
+    def to_bytes(self):
+        return self.HEADER.pack(self.num_bits, self.num_hashes, self.items) + bytes(
+            self.bits
+        )
+
+    def _positions(self, value):
+        first = _hash64(value, b"bloom1")
+        second = _hash64(value, b"bloom2") | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
@@ -1,3 +1,961 @@
-from django.test import TestCase
+import io
+import json
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from rest_framework.utils.urls import replace_query_param
+
+from apps.common.cache import get_generation
+from apps.common.serializers import CompiledSerializer
+from apps.users.models import User
+
+from .buckets import filter_by_criteria, get_bucket_filter, get_canonical_choice
+from .caching import CATALOGUE_GENERATION, get_detail_key
+from .changes import encode_cursor
+from .exports import export_properties
+from .imports import import_properties, read_rows
+from .locality import autocomplete_index
+from .models import (
+    Property,
+    PropertyRepresentation,
+    PropertySlugCounter,
+    PropertyView,
+    PropertyViewRollup,
+)
+from .pagination import PropertyCursorPagination
+from .serializers import PropertySerializer
+from .sketches import BloomFilter, HyperLogLog
+from .tracking import ViewRecorder
+from .views import PropertyFilter
+
+# Keep off the cache a dev server on this host is using; tests clear it
+test_caches = override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+
+
+def setUpModule():
+    test_caches.enable()
+
+
+def tearDownModule():
+    test_caches.disable()
+
+
+def create_agent(username="agent"):
+    return User.objects.create_user(
+        username=username,
+        first_name="Test",
+        last_name="Agent",
+        email=f"{username}@example.com",
+        password="password",
+    )
+
+
+def create_property(user, **fields):
+    fields = {
+        "title": "Sea view villa",
+        "country": "IN",
+        "city": "Goa",
+        "postal_code": "403001",
+        "street_address": "Beach Road",
+        "property_number": 1,
+        "price": 1000000,
+        "published_status": True,
+        **fields,
+    }
+    return Property.objects.create(user=user, **fields)
+
+
+class PropertySearchBucketTests(TestCase):
+    def test_open_ended_bucket(self):
+        self.assertEqual(
+            str(get_bucket_filter("number_of_bedrooms", "20+")),
+            "(AND: ('number_of_bedrooms__gte', 20))",
+        )
+
+    def test_single_value_bucket(self):
+        self.assertEqual(
+            str(get_bucket_filter("number_of_bathrooms", "0")),
+            "(AND: ('number_of_bathrooms', 0))",
+        )
+
+    def test_any_does_not_filter(self):
+        self.assertFalse(get_bucket_filter("price", "any"))
+        self.assertFalse(get_bucket_filter("price", None))
+
+    def test_unknown_bucket(self):
+        with self.assertRaises(ValidationError):
+            get_bucket_filter("price", "below₹2L")
+
+    def test_canonical_choice(self):
+        self.assertEqual(get_canonical_choice("advert_type", "for sale"), "For Sale")
+        with self.assertRaises(ValidationError):
+            get_canonical_choice("property_type", "castle")
+
+
+@skipUnless(connection.vendor == "postgresql", "Query plans are checked on PostgreSQL")
+class PropertySearchQueryPlanTests(TestCase):
+    """
+    The structured search filters must be served by the composite and
+    functional indexes rather than a sequential scan of properties.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = create_agent()
+        advert_types = Property.AdvertType.values
+        property_types = Property.PropertyType.values
+        Property.objects.bulk_create(
+            [
+                Property(
+                    user=user,
+                    title=f"Property {number}",
+                    slug=f"property-{number}",
+                    ref_code=f"REF{number}",
+                    country="IN",
+                    city="Pune",
+                    postal_code="411001",
+                    street_address="FC Road",
+                    property_number=number + 1,
+                    price=number * 10000,
+                    number_of_bedrooms=number % 25,
+                    number_of_bathrooms=number % 12,
+                    advert_type=advert_types[number % len(advert_types)],
+                    property_type=property_types[number % len(property_types)],
+                    published_status=number % 3 != 0,
+                )
+                for number in range(300)
+            ]
+        )
+
+    def assertUsesIndex(self, queryset, index_name):
+        # Tiny test tables are cheapest to scan, so only check that the
+        # planner can use the index at all
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.order_by().explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn("Seq Scan", plan)
+
+    def test_search_criteria_use_search_index(self):
+        queryset = filter_by_criteria(
+            Property.published.all(),
+            {
+                "advert_type": "for rent",
+                "property_type": "apartment",
+                "price": "below₹10L",
+                "number_of_bedrooms": "1-2",
+            },
+        )
+        self.assertUsesIndex(queryset, "property_search_idx")
+
+    def test_type_criteria_use_search_index(self):
+        queryset = filter_by_criteria(
+            Property.published.all(),
+            {"advert_type": "For Sale", "property_type": "House"},
+        )
+        self.assertUsesIndex(queryset, "property_search_idx")
+
+    def test_case_insensitive_list_filters_use_functional_index(self):
+        queryset = PropertyFilter(
+            {"advert_type": "for sale", "property_type": "house"},
+            queryset=Property.objects.all(),
+        ).qs
+        self.assertUsesIndex(queryset, "property_type_ci_idx")
+
+
+class PropertyDirtyFieldsTests(TestCase):
+    def setUp(self):
+        create_property(create_agent(), published_status=False)
+        self.property = Property.objects.get()
+
+    def get_updates(self, queries):
+        return [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+
+    def test_save_writes_changed_columns(self):
+        ref_code, slug = self.property.ref_code, self.property.slug
+        self.property.published_status = True
+        with CaptureQueriesContext(connection) as queries:
+            self.property.save()
+
+        (update,) = self.get_updates(queries)
+        self.assertIn('"published_status"', update)
+        self.assertIn('"updated_at"', update)
+        self.assertNotIn('"ref_code"', update)
+        self.assertNotIn('"slug"', update)
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.ref_code, ref_code)
+        self.assertEqual(self.property.slug, slug)
+
+    def test_unchanged_save_does_not_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.property.save()
+        self.assertEqual(self.get_updates(queries), [])
+
+    def test_title_change_regenerates_slug_and_ref_code(self):
+        ref_code = self.property.ref_code
+        self.property.title = "hill view villa"
+        self.property.save()
+
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.slug, "hill-view-villa")
+        self.assertNotEqual(self.property.ref_code, ref_code)
+        self.assertEqual(self.property.get_dirty_fields(), set())
+
+
+class PropertySlugTests(TestCase):
+    def setUp(self):
+        self.property = create_property(create_agent())
+
+    def test_slugs_are_numbered_per_base(self):
+        slugs = PropertySlugCounter.objects.allocate(
+            ["Sea view villa", "Sea View Villa", "Hill house"]
+        )
+        self.assertEqual(slugs, ["sea-view-villa-2", "sea-view-villa-3", "hill-house"])
+
+    def test_taken_slug_gets_random_suffix(self):
+        self.property.title = "Sea view villa 2"
+        self.property.save()
+        self.assertEqual(self.property.slug, "sea-view-villa-2")
+
+        (slug,) = PropertySlugCounter.objects.allocate(["Sea view villa"])
+        self.assertRegex(slug, r"^sea-view-villa-[a-z0-9]{6}$")
+
+
+class PropertyImportTests(TestCase):
+    def setUp(self):
+        self.user = create_agent()
+        self.row = {
+            "title": "lake house",
+            "country": "IN",
+            "city": "Bhopal",
+            "postal_code": "462001",
+            "street_address": "Lake Road",
+            "property_number": 1,
+            "price": "500000",
+        }
+
+    def test_import_reports_invalid_rows(self):
+        rows = [self.row, dict(self.row, price="cheap"), "not a row", self.row]
+        report = import_properties(rows, self.user, batch_size=2)
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [2, 3])
+        self.assertIn("price", report["errors"][0]["errors"])
+        properties = Property.objects.filter(user=self.user).order_by("slug")
+        self.assertEqual(
+            [property.slug for property in properties], ["lake-house", "lake-house-2"]
+        )
+        self.assertEqual(properties[0].title, "Lake House")
+        self.assertNotEqual(properties[0].ref_code, properties[1].ref_code)
+
+    def test_read_csv_rows(self):
+        stream = io.StringIO("title,city,tax\nLake house,Bhopal,\n")
+        self.assertEqual(
+            list(read_rows(stream, "csv")), [{"title": "Lake house", "city": "Bhopal"}]
+        )
+
+
+class PropertyBatchDetailTests(TestCase):
+    def setUp(self):
+        user = create_agent()
+        create_property(user, title="lake house")
+        create_property(user, title="lake house")
+
+    def test_batch_details_keep_request_order(self):
+        response = APIClient().get(
+            reverse("property-batch-details"),
+            {"slugs": "lake-house-2,sold-house,lake-house", "fields": "slug"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"], [{"slug": "lake-house-2"}, {"slug": "lake-house"}]
+        )
+        self.assertEqual(response.data["missing"], ["sold-house"])
+
+    def test_non_object_body_is_rejected(self):
+        for body in (["lake-house"], "lake-house"):
+            response = APIClient().post(
+                reverse("property-batch-details"), body, format="json"
+            )
+            self.assertEqual(response.status_code, 400)
+
+
+class PropertyExportTests(TestCase):
+    def setUp(self):
+        user = create_agent()
+        create_property(user, title="lake house", published_status=False)
+        create_property(user, title="lake house")
+
+    def test_export_streams_published_properties(self):
+        queryset = Property.published.order_by("pkid")
+
+        lines = b"".join(
+            export_properties(queryset, "ndjson", chunk_size=1, fields=["slug"])
+        )
+        self.assertEqual(lines, b'{"slug":"lake-house-2"}\n')
+        rows = b"".join(export_properties(queryset, "csv", fields=["slug", "user"]))
+        self.assertEqual(rows, b"user,slug\r\nagent,lake-house-2\r\n")
+
+
+@override_settings(PROPERTY_VIEW_FLUSH_INTERVAL=0)
+class PropertyDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_agent()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property = create_property(self.user)
+        self.url = reverse("property-details", args=[self.property.slug])
+
+    def get(self, **headers):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(self.url, **headers)
+
+    def test_serializer_change_is_not_served_from_cache(self):
+        etag = self.get()["ETag"]
+        self.assertIsNotNone(cache.get(get_detail_key(self.property.slug)))
+
+        with mock.patch("apps.properties.caching.get_version", return_value="next"):
+            self.assertIsNone(cache.get(get_detail_key(self.property.slug)))
+            with mock.patch("apps.properties.views.get_version", return_value="next"):
+                response = self.get(HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+            self.assertIsNotNone(cache.get(get_detail_key(self.property.slug)))
+
+    def test_renamed_agent_is_not_served_from_cache(self):
+        # The first view is counted, which changes the cached version
+        self.get()
+        self.assertEqual(self.get().json()["user"], "agent")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = "renamed"
+            self.user.save()
+        self.assertEqual(self.get().json()["user"], "renamed")
+
+    def test_missing_property_with_fields_is_not_found(self):
+        url = reverse("property-details", args=["missing"])
+        self.assertEqual(self.client.get(url, {"fields": "slug"}).status_code, 404)
+
+    def test_renamed_agent_changes_etag(self):
+        self.get()
+        etag = self.get()["ETag"]
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = "renamed"
+            self.user.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(PROPERTY_SEARCH_MAX_RESULTS=3, PROPERTY_SEARCH_CACHE_TIMEOUT=0)
+class PropertySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = create_agent()
+        for bedrooms in (0, 0, 2, 2, 2):
+            create_property(user, title="Lake house", number_of_bedrooms=bedrooms)
+
+    def test_criteria_apply_before_result_limit(self):
+        response = self.client.get(
+            reverse("search-properties"),
+            {"query": "lake", "number_of_bedrooms": "0"},
+        )
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_facets_count_every_text_match(self):
+        facets = self.client.get(
+            reverse("property-search-facets"),
+            {"query": "lake", "number_of_bedrooms": "0"},
+        ).json()
+
+        self.assertEqual(facets["count"], 2)
+        bedrooms = {
+            option["value"]: option["count"]
+            for option in facets["facets"]["number_of_bedrooms"]
+        }
+        self.assertEqual(bedrooms["0"], 2)
+        self.assertEqual(bedrooms["1-2"], 3)
+
+    def test_pages_stop_at_result_window(self):
+        first = self.client.get(reverse("search-properties"), {"page_size": 2}).json()
+        self.assertEqual(len(first["results"]), 2)
+        self.assertIsNone(first["previous"])
+
+        last = self.client.get(first["next"]).json()
+        self.assertEqual(len(last["results"]), 1)
+        self.assertIsNone(last["next"])
+        self.assertIsNotNone(last["previous"])
+
+        previous = self.client.get(last["previous"]).json()
+        self.assertEqual(previous["results"], first["results"])
+
+    def test_count_modes(self):
+        url = reverse("search-properties")
+        counts = {
+            count_mode: self.client.get(url, {"count": count_mode}).json()["count"]
+            for count_mode in ("exact", "estimated", "none")
+        }
+        self.assertEqual(counts["exact"], 5)
+        self.assertIsNone(counts["none"])
+        if connection.vendor != "postgresql":
+            # Counted up to one past the result window
+            self.assertEqual(counts["estimated"], 4)
+        else:
+            self.assertIsInstance(counts["estimated"], int)
+
+    def test_invalid_page_params_are_rejected(self):
+        url = reverse("search-properties")
+        self.assertEqual(self.client.get(url, {"count": "all"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"page_size": "ten"}).status_code, 400)
+
+
+class PropertyLocationSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = create_agent()
+        self.slugs = [
+            create_property(user, title=f"Villa {number}").slug for number in range(3)
+        ]
+
+    def test_equally_similar_matches_keep_list_ordering(self):
+        response = self.client.get(reverse("all-properties"), {"search": "goa"})
+        slugs = [result["slug"] for result in response.json()["results"]]
+        self.assertEqual(slugs, self.slugs[::-1])
+
+    def test_city_named_like_a_country_code_matches_both(self):
+        user = User.objects.get()
+        bra = create_property(user, title="Vineyard", country="IT", city="Bra")
+        recife = create_property(user, title="Beach flat", country="BR", city="Recife")
+
+        response = self.client.get(reverse("all-properties"), {"search": "bra"})
+        slugs = [result["slug"] for result in response.json()["results"]]
+        self.assertEqual(slugs, [recife.slug, bra.slug])
+
+
+class PropertyKeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = create_agent()
+        self.slugs = [
+            create_property(user, title=f"Villa {number}").slug for number in range(3)
+        ]
+        self.url = reverse("all-properties")
+
+    def get_page(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def get_cursor(self, values):
+        payload = {"o": ["created_at", "pkid"], "v": values, "r": False, "p": 0}
+        return urlsafe_b64encode(json.dumps(payload).encode("ascii")).decode("ascii")
+
+    @mock.patch.object(PropertyCursorPagination, "page_size", 2)
+    def test_next_and_previous_links(self):
+        newest_first = self.slugs[::-1]
+        first = self.get_page(pagination="cursor")
+        self.assertEqual([row["slug"] for row in first["results"]], newest_first[:2])
+        self.assertIsNone(first["previous"])
+
+        second = self.get_page(first["next"])
+        self.assertEqual([row["slug"] for row in second["results"]], newest_first[2:])
+        self.assertIsNone(second["next"])
+
+        back = self.get_page(second["previous"])
+        self.assertEqual([row["slug"] for row in back["results"]], newest_first[:2])
+
+    def test_tampered_cursors_are_not_found(self):
+        for values in (
+            [{"datetime": "2022-01-01T00:00:00+00:00"}],
+            [{"decimal": "x"}, 1],
+            ["yesterday", 1],
+            [{"datetime": "2022-01-01T00:00:00+00:00"}, "one"],
+        ):
+            with self.subTest(values=values):
+                response = self.client.get(
+                    self.url, {"cursor": self.get_cursor(values)}
+                )
+                self.assertEqual(response.status_code, 404)
+
+
+@override_settings(PROPERTY_CHANGES_SETTLE_SECONDS=0)
+class PropertyChangeFeedTests(TestCase):
+    def setUp(self):
+        user = create_agent()
+        self.first = create_property(user, title="First villa")
+        self.second = create_property(user, title="Second villa")
+        self.url = reverse("property-changes")
+
+    def get_feed(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_changes_and_deletions_are_merged_in_order(self):
+        feed = self.get_feed(f"{self.url}?fields=slug")
+        self.assertEqual(
+            [row["slug"] for row in feed["changed"]], ["first-villa", "second-villa"]
+        )
+        self.assertFalse(feed["has_more"])
+
+        self.first.published_status = False
+        self.first.save()
+        second_id = str(self.second.id)
+        self.second.delete()
+
+        feed = self.get_feed(replace_query_param(feed["next"], "limit", 1))
+        self.assertEqual([row["slug"] for row in feed["changed"]], ["first-villa"])
+        self.assertEqual(feed["deleted"], [])
+        self.assertTrue(feed["has_more"])
+
+        feed = self.get_feed(feed["next"])
+        self.assertEqual(feed["changed"], [])
+        self.assertEqual([row["id"] for row in feed["deleted"]], [second_id])
+
+        feed = self.get_feed(feed["next"])
+        self.assertEqual((feed["changed"], feed["deleted"]), ([], []))
+
+    def test_forged_cursor_is_not_found(self):
+        cursor = encode_cursor({"changed": [5, 1], "deleted": [5, 1]})
+        response = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_past_retention_must_sync_from_scratch(self):
+        retention = timedelta(days=settings.PROPERTY_TOMBSTONE_RETENTION_DAYS + 1)
+        cursor = encode_cursor(
+            {"changed": [None, 0], "deleted": [timezone.now() - retention, 0]}
+        )
+        response = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+
+
+class CompiledSerializerTests(TestCase):
+    def setUp(self):
+        property = create_property(create_agent(), tax="0.18", number_of_floors=2)
+        property.image1 = ""
+        property.save()
+        self.context = {"request": RequestFactory().get("/")}
+
+    def assertCompiledMatches(self, **selection):
+        compiled = CompiledSerializer(
+            PropertySerializer, context=self.context, **selection
+        )
+        rows = compiled.values(Property.objects.all())
+        expected = PropertySerializer(
+            Property.objects.get(), context=self.context, **selection
+        ).data
+        self.assertEqual(compiled.to_representation(rows), [expected])
+        return expected
+
+    def test_full_row_matches_serializer(self):
+        expected = self.assertCompiledMatches()
+        self.assertEqual(expected["user"], "agent")
+        self.assertEqual(expected["country"], "India")
+        self.assertEqual(
+            expected["cover_image"],
+            "http://testserver/media/sample_property_cover_image.jpg",
+        )
+        self.assertIsNone(expected["image1"])
+
+    def test_field_selection_matches_serializer(self):
+        self.assertCompiledMatches(
+            fields=["user", "country", "cover_image", "final_property_price"]
+        )
+        self.assertCompiledMatches(exclude=["description", "image2"])
+
+
+class ViewRecorderTests(TestCase):
+    def setUp(self):
+        self.property = create_property(create_agent())
+        self.recorder = ViewRecorder(flush_interval=60, buffer_size=100)
+        self.addCleanup(self.recorder.flush)
+
+    def test_views_are_buffered_until_flushed(self):
+        self.recorder.record(self.property.pkid, "10.0.0.1")
+        self.recorder.record(self.property.pkid, "10.0.0.2")
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.views, 0)
+
+        self.assertEqual(self.recorder.flush(), 2)
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.views, 2)
+        self.assertEqual(self.property.property_views.count(), 2)
+
+    def test_repeat_viewers_are_counted_once(self):
+        self.recorder.record(self.property.pkid, "10.0.0.1")
+        self.recorder.record(self.property.pkid, "10.0.0.1")
+        self.recorder.flush()
+        self.recorder.record(self.property.pkid, "10.0.0.1")
+        self.assertEqual(self.recorder.flush(), 0)
+
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.views, 1)
+
+
+class ViewSketchTests(TestCase):
+    def test_hyperloglog_estimate_and_round_trip(self):
+        sketch = HyperLogLog()
+        for number in range(5000):
+            sketch.add(f"10.0.{number // 256}.{number % 256}")
+        self.assertAlmostEqual(sketch.count(), 5000, delta=5000 * 0.05)
+        self.assertEqual(
+            HyperLogLog.from_bytes(sketch.to_bytes()).count(), sketch.count()
+        )
+
+    def test_bloom_filter_membership_and_round_trip(self):
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        for number in range(1000):
+            bloom.add(f"seen-{number}")
+        bloom = BloomFilter.from_bytes(bloom.to_bytes())
+
+        self.assertTrue(all(f"seen-{number}" in bloom for number in range(1000)))
+        false_positives = sum(f"unseen-{number}" in bloom for number in range(1000))
+        self.assertLess(false_positives, 50)
+        self.assertEqual(bloom.items, 1000)
+
+    @override_settings(PROPERTY_VIEW_COUNTING="sketch")
+    def test_sketch_store_counts_unique_viewers(self):
+        property = create_property(create_agent())
+        recorder = ViewRecorder(flush_interval=60, buffer_size=100)
+        for viewer_ip in ("10.0.0.1", "10.0.0.2"):
+            recorder.record(property.pkid, viewer_ip)
+        recorder.flush()
+        for viewer_ip in ("10.0.0.2", "10.0.0.3"):
+            recorder.record(property.pkid, viewer_ip)
+        recorder.flush()
+
+        property.refresh_from_db()
+        self.assertEqual(property.views, 3)
+        self.assertEqual(property.view_sketch.unique_viewers, 3)
+        self.assertFalse(property.property_views.exists())
+
+
+class PropertyViewRollupTests(TestCase):
+    def setUp(self):
+        self.user = create_agent()
+        self.property = create_property(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_record_adds_to_hour_and_day_buckets(self):
+        timestamp = timezone.localtime().replace(hour=10, minute=30)
+        PropertyViewRollup.objects.record({self.property.pkid: 2}, timestamp)
+        PropertyViewRollup.objects.record(
+            {self.property.pkid: 3}, timestamp + timedelta(minutes=10)
+        )
+        PropertyViewRollup.objects.record(
+            {self.property.pkid: 4}, timestamp + timedelta(hours=1)
+        )
+
+        buckets = dict(
+            PropertyViewRollup.objects.filter(
+                granularity=PropertyViewRollup.Granularity.HOUR
+            ).values_list("bucket", "views")
+        )
+        hour = timestamp.replace(minute=0, second=0, microsecond=0)
+        self.assertEqual(buckets, {hour: 5, hour + timedelta(hours=1): 4})
+        day = PropertyViewRollup.objects.get(
+            granularity=PropertyViewRollup.Granularity.DAY
+        )
+        self.assertEqual(day.bucket, hour.replace(hour=0))
+        self.assertEqual(day.views, 9)
+
+    def test_views_endpoint_sums_buckets(self):
+        now = timezone.now()
+        PropertyViewRollup.objects.record({self.property.pkid: 2}, now)
+        PropertyViewRollup.objects.record(
+            {self.property.pkid: 3}, now - timedelta(hours=2)
+        )
+
+        response = self.client.get(
+            reverse("property-views"),
+            {"granularity": "hour", "property": self.property.slug},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 5)
+        self.assertEqual(
+            [bucket["views"] for bucket in response.data["series"]], [3, 2]
+        )
+
+    def test_views_endpoint_rejects_unknown_granularity(self):
+        response = self.client.get(reverse("property-views"), {"granularity": "week"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rebuild_recomputes_rollups_from_raw_views(self):
+        now = timezone.localtime()
+        hour = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+        for minutes, viewer_ip in ((5, "10.0.0.1"), (10, "10.0.0.2"), (70, "10.0.0.3")):
+            view = PropertyView.objects.create(
+                property=self.property, viewer_ip=viewer_ip
+            )
+            PropertyView.objects.filter(pkid=view.pkid).update(
+                created_at=hour + timedelta(minutes=minutes)
+            )
+        # A flush lost after its raw rows were written
+        PropertyViewRollup.objects.record({self.property.pkid: 1}, hour)
+
+        call_command("compact_property_views", "--rebuild", stdout=io.StringIO())
+
+        buckets = dict(
+            PropertyViewRollup.objects.filter(
+                granularity=PropertyViewRollup.Granularity.HOUR
+            ).values_list("bucket", "views")
+        )
+        self.assertEqual(buckets, {hour: 2, hour + timedelta(hours=1): 1})
+        days = PropertyViewRollup.objects.filter(
+            granularity=PropertyViewRollup.Granularity.DAY
+        )
+        self.assertEqual(sum(day.views for day in days), 3)
+
+    @override_settings(PROPERTY_VIEW_COUNTING="sketch")
+    def test_rebuild_needs_exact_counting(self):
+        with self.assertRaises(CommandError):
+            call_command("compact_property_views", "--rebuild", stdout=io.StringIO())
+
+
+class PropertyAutocompleteTests(TestCase):
+    def setUp(self):
+        self.user = create_agent()
+        create_property(self.user, city="Goa")
+        autocomplete_index.rebuild()
+
+    def suggest(self, prefix):
+        return {
+            (field, value): count
+            for field, value, label, count in autocomplete_index.suggest(prefix)
+        }
+
+    def test_new_property_is_suggested(self):
+        create_property(self.user, city="Pune")
+        create_property(self.user, city="Pune")
+        self.assertEqual(self.suggest("pu"), {("city", "Pune"): 2})
+
+        response = self.client.get(
+            reverse("property-autocomplete"), {"q": "pu", "kind": "city"}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [{"kind": "city", "value": "Pune", "label": "Pune", "count": 2}],
+        )
+
+    def test_changed_property_moves_to_new_value(self):
+        property = create_property(self.user, city="Pune")
+        property.city = "Panaji"
+        property.save()
+
+        self.assertEqual(self.suggest("pu"), {})
+        self.assertEqual(self.suggest("pa"), {("city", "Panaji"): 1})
+
+    def test_unpublished_and_deleted_properties_are_dropped(self):
+        unpublished = create_property(self.user, city="Pune")
+        deleted = create_property(self.user, city="Pune")
+        unpublished.published_status = False
+        unpublished.save()
+        self.assertEqual(self.suggest("pu"), {("city", "Pune"): 1})
+
+        deleted.delete()
+        self.assertEqual(self.suggest("pu"), {})
+        self.assertEqual(self.suggest("go"), {("city", "Goa"): 1})
+
+
+class PropertyProjectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_agent()
+        self.property = create_property(self.user)
+
+    def test_projection_joins_only_what_is_rendered(self):
+        queryset = PropertySerializer.setup_queryset(Property.objects.all())
+        self.assertEqual(queryset.query.select_related, {"user": {}})
+        self.assertIn("user__username", queryset.query.deferred_loading[0])
+
+        queryset = PropertySerializer.setup_queryset(
+            Property.objects.all(), fields=["slug", "title"]
+        )
+        self.assertFalse(queryset.query.select_related)
+        self.assertEqual(queryset.query.deferred_loading, ({"slug", "title"}, False))
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        def count_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse("all-properties"))
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        expected = count_queries()
+        for number in range(2, 6):
+            create_property(self.user, title=f"Villa {number}")
+        self.assertEqual(count_queries(), expected)
+
+    @mock.patch("apps.properties.views.view_recorder", mock.Mock())
+    def test_detail_fields_skip_the_agent_join(self):
+        url = reverse("property-details", args=[self.property.slug])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"fields": "slug,title"})
+
+        self.property.refresh_from_db()
+        self.assertEqual(
+            response.json(), {"slug": self.property.slug, "title": self.property.title}
+        )
+        # The query that loads the property to render, not the version lookup
+        [sql] = [
+            query["sql"]
+            for query in queries
+            if '"properties_property"."title"' in query["sql"]
+        ]
+        self.assertNotIn("JOIN", sql)
+        self.assertNotIn('"properties_property"."description"', sql)
+
+
+@mock.patch("apps.properties.views.view_recorder", mock.Mock())
+class PropertyRepresentationTests(TestCase):
+    def setUp(self):
+        user = create_agent()
+        self.property = create_property(user, tax="0.18")
+        create_property(user, title="Lake house", cover_image="")
+
+    def get_json(self, url, materialized):
+        cache.clear()
+        with override_settings(PROPERTY_MATERIALIZED_JSON=materialized):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def assertMaterializedMatches(self, url):
+        expected = self.get_json(url, materialized=False)
+        self.assertEqual(self.get_json(url, materialized=True), expected)
+        return expected
+
+    def test_list_detail_and_search_match_serializer(self):
+        results = self.assertMaterializedMatches(reverse("all-properties"))["results"]
+        self.assertEqual(
+            {result["cover_image"] for result in results},
+            {None, "http://testserver/media/sample_property_cover_image.jpg"},
+        )
+        self.assertMaterializedMatches(
+            reverse("property-details", args=[self.property.slug])
+        )
+        self.assertMaterializedMatches(reverse("search-properties"))
+        self.assertEqual(PropertyRepresentation.objects.count(), 2)
+
+    def test_stale_representation_is_refreshed(self):
+        url = reverse("property-details", args=[self.property.slug])
+        self.get_json(url, materialized=True)
+        with override_settings(PROPERTY_MATERIALIZED_JSON=True):
+            self.property.price = 2000000
+            self.property.save()
+
+        self.assertEqual(self.assertMaterializedMatches(url)["price"], "2000000.00")
+
+
+@mock.patch("apps.properties.views.view_recorder", mock.Mock())
+class PropertyListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_agent()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property = create_property(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_titles(self):
+        return {
+            name: sorted(
+                result["title"] for result in self.client.get(url).json()["results"]
+            )
+            for name, url in (
+                ("all", reverse("all-properties")),
+                ("agent", reverse("agent-properties")),
+                ("search", reverse("search-properties")),
+            )
+        }
+
+    def test_created_property_is_listed(self):
+        self.get_titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_property(self.user, title="Lake house")
+
+        titles = ["Lake House", "Sea View Villa"]
+        self.assertEqual(
+            self.get_titles(), {"all": titles, "agent": titles, "search": titles}
+        )
+
+    def test_updated_property_is_listed_with_new_values(self):
+        self.get_titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.title = "Lake house"
+            self.property.save()
+
+        titles = ["Lake House"]
+        self.assertEqual(
+            self.get_titles(), {"all": titles, "agent": titles, "search": titles}
+        )
+
+    def test_unpublished_and_deleted_properties_leave_lists(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted = create_property(self.user, title="Lake house")
+        self.get_titles()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.published_status = False
+            self.property.save()
+        titles = self.get_titles()
+        self.assertEqual(titles["search"], ["Lake House"])
+        self.assertEqual(titles["all"], ["Lake House", "Sea View Villa"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted.delete()
+        titles = ["Sea View Villa"]
+        self.assertEqual(
+            self.get_titles(), {"all": titles, "agent": titles, "search": []}
+        )
+
+    def test_list_revalidates_without_queries_until_a_delete(self):
+        etags = {}
+        for url in (reverse("all-properties"), reverse("agent-properties")):
+            response = self.client.get(url)
+            self.assertNotIn("Last-Modified", response)
+            etags[url] = response["ETag"]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.delete()
+
+        for url, etag in etags.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["results"], [])
+
+    def test_view_flush_refreshes_searches_but_not_facets(self):
+        search = self.client.get(reverse("search-properties")).json()
+        self.assertEqual(search["results"][0]["views"], 0)
+        facets = get_generation(CATALOGUE_GENERATION)
+
+        recorder = ViewRecorder(flush_interval=60, buffer_size=100)
+        recorder.record(self.property.pkid, "10.0.0.1")
+        with self.captureOnCommitCallbacks(execute=True):
+            recorder.flush()
+
+        self.assertEqual(get_generation(CATALOGUE_GENERATION), facets)
+        search = self.client.get(reverse("search-properties")).json()
+        self.assertEqual(search["results"][0]["views"], 1)
@@ -0,0 +1,210 @@
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import invalidate_property_details, invalidate_property_lists
+from .models import Property, PropertyView, PropertyViewRollup, PropertyViewSketch
+from .representations import is_materialized, refresh_representations
+
+logger = logging.getLogger(__name__)
+
+
+def get_viewer_ip(request):
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        return x_forwarded_for.split(",")[0]
+    return request.META.get("REMOTE_ADDR")
+
+
+class ViewRecorder:
+    """
+    Collects (property, viewer_ip) events in process and writes them in
+    batches, either every ``flush_interval`` seconds or as soon as
+    ``buffer_size`` distinct events are pending.
+    """
+
+    def __init__(self, flush_interval=None, buffer_size=None):
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._events = defaultdict(set)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def get_flush_interval(self):
+        if self.flush_interval is not None:
+            return self.flush_interval
+        return settings.PROPERTY_VIEW_FLUSH_INTERVAL
+
+    def get_buffer_size(self):
+        if self.buffer_size is not None:
+            return self.buffer_size
+        return settings.PROPERTY_VIEW_BUFFER_SIZE
+
+    def record(self, property_pkid, viewer_ip):
+        flush_interval = self.get_flush_interval()
+
+        with self._lock:
+            viewers = self._events[property_pkid]
+            if viewer_ip in viewers:
+                return
+            viewers.add(viewer_ip)
+            self._pending += 1
+            buffer_full = self._pending >= self.get_buffer_size()
+            if not buffer_full and flush_interval:
+                self._schedule(flush_interval)
+
+        if not flush_interval:
+            self.flush()
+        elif buffer_full:
+            threading.Thread(target=self._background_flush, daemon=True).start()
+
+    def _schedule(self, flush_interval):
+        if self._timer is None:
+            self._timer = threading.Timer(flush_interval, self._background_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, defaultdict(set)
+            self._pending = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not events:
+            return 0
+
+        with self._flush_lock:
+            try:
+                return self.write(events)
+            except Exception:
+                logger.exception(f"Failed to flush views for {len(events)} properties")
+                return 0
+
+    def get_store(self):
+        return VIEW_STORES[settings.PROPERTY_VIEW_COUNTING]()
+
+    def write(self, events):
+        with transaction.atomic():
+            properties = {
+                row.pkid: row
+                for row in Property.objects.filter(pkid__in=events.keys()).values_list(
+                    "pkid", "user_id", "slug", "published_status", named=True
+                )
+            }
+            live_events = {pkid: events[pkid] for pkid in properties}
+            counts = +self.get_store().record(live_events)
+
+            for pkid, count in counts.items():
+                Property.objects.filter(pkid=pkid).update(views=F("views") + count)
+            PropertyViewRollup.objects.record(counts)
+
+        # The view count is part of the stored representation, list pages
+        # and details
+        if counts:
+            invalidate_property_lists(
+                {properties[pkid].user_id for pkid in counts},
+                published=any(properties[pkid].published_status for pkid in counts),
+                views=True,
+            )
+            invalidate_property_details([properties[pkid].slug for pkid in counts])
+            if is_materialized():
+                refresh_representations(counts)
+
+        return sum(counts.values())
+
+
+class ExactViewStore:
+    """Keeps one PropertyView row per (property, viewer_ip) as an audit trail."""
+
+    def record(self, events):
+        if not events:
+            return Counter()
+
+        viewer_ips = set().union(*events.values())
+        existing = set(
+            PropertyView.objects.filter(
+                property_id__in=events.keys(), viewer_ip__in=viewer_ips
+            ).values_list("property_id", "viewer_ip")
+        )
+
+        new_views = [
+            PropertyView(property_id=pkid, viewer_ip=viewer_ip)
+            for pkid, viewers in events.items()
+            for viewer_ip in viewers
+            if (pkid, viewer_ip) not in existing
+        ]
+        PropertyView.objects.bulk_create(new_views)
+
+        return Counter(view.property_id for view in new_views)
+
+
+class SketchViewStore:
+    """
+    Dedupes viewers with a rotating Bloom filter and estimates unique
+    viewers with a HyperLogLog sketch, one compact row per property.
+    """
+
+    def record(self, events):
+        if not events:
+            return Counter()
+
+        PropertyViewSketch.objects.bulk_create(
+            [PropertyViewSketch(property_id=pkid) for pkid in events],
+            ignore_conflicts=True,
+        )
+        sketches = list(
+            PropertyViewSketch.objects.select_for_update().filter(
+                property_id__in=events.keys()
+            )
+        )
+
+        counts = Counter()
+        now = timezone.now()
+        for sketch in sketches:
+            sketch.updated_at = now
+            counts[sketch.property_id] = sketch.record(
+                events[sketch.property_id],
+                capacity=settings.PROPERTY_VIEW_BLOOM_CAPACITY,
+                error_rate=settings.PROPERTY_VIEW_BLOOM_ERROR_RATE,
+                rotate_after=settings.PROPERTY_VIEW_BLOOM_ROTATION,
+            )
+
+        PropertyViewSketch.objects.bulk_update(
+            sketches,
+            [
+                "unique_viewers",
+                "hyperloglog",
+                "bloom_filter",
+                "previous_bloom_filter",
+                "bloom_rotated_at",
+                "updated_at",
+            ],
+        )
+        return counts
+
+
+VIEW_STORES = {
+    "exact": ExactViewStore,
+    "sketch": SketchViewStore,
+}
+
+
+view_recorder = ViewRecorder()
+
+atexit.register(view_recorder.flush)
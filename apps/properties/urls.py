@@ -3,10 +3,17 @@ from django.urls import path
 from apps.properties.views import (
     ListAgentsPropertiesAPIView,
     ListAllPropertiesAPIView,
+    PropertyAutocompleteAPIView,
+    PropertyBatchDetailAPIView,
+    PropertyChangesAPIView,
     PropertyDetailAPIView,
+    PropertyExportAPIView,
+    PropertyFacetsAPIView,
     PropertySearchAPIView,
+    PropertyViewsAPIView,
     create_property_api_view,
     delete_property_api_view,
+    import_properties_api_view,
     update_property_api_view,
 )
 
@@ -14,10 +21,25 @@ urlpatterns = [
     path("all/", ListAllPropertiesAPIView.as_view(), name="all-properties"),
     path("agents/", ListAgentsPropertiesAPIView.as_view(), name="agent-properties"),
     path("create/", create_property_api_view, name="create-property"),
+    path("import/", import_properties_api_view, name="import-properties"),
+    path(
+        "autocomplete/",
+        PropertyAutocompleteAPIView.as_view(),
+        name="property-autocomplete",
+    ),
+    path("views/", PropertyViewsAPIView.as_view(), name="property-views"),
+    path("changes/", PropertyChangesAPIView.as_view(), name="property-changes"),
+    path(
+        "details/", PropertyBatchDetailAPIView.as_view(), name="property-batch-details"
+    ),
+    path("export/", PropertyExportAPIView.as_view(), name="export-properties"),
     path(
         "<slug:slug>/details/", PropertyDetailAPIView.as_view(), name="property-details"
     ),
     path("<slug:slug>/update/", update_property_api_view, name="update-property"),
     path("<slug:slug>/delete/", delete_property_api_view, name="delete-property"),
     path("search/", PropertySearchAPIView.as_view(), name="search-properties"),
+    path(
+        "search/facets/", PropertyFacetsAPIView.as_view(), name="property-search-facets"
+    ),
 ]
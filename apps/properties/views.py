@@ -1,21 +1,68 @@
+import csv
+import io
 import logging
+import uuid
+from datetime import datetime, time, timedelta
+from itertools import islice
 
 import django_filters
-from django.db.models import Q
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django_countries import countries
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
+from apps.common.cache import get_generation, make_cache_key
+from apps.common.serializers import CompiledSerializer, get_field_selection
+from apps.common.views import (
+    CachedListMixin,
+    CompiledListMixin,
+    ConditionalListMixin,
+    conditional_get,
+)
+
+from .caching import (
+    LIST_GENERATION,
+    get_agent_generation,
+    get_cached_detail,
+    get_search_generations,
+    load_detail_version,
+)
+from .changes import decode_cursor, encode_cursor, get_changes
 from .exceptions import PropertyNotFound
-from .models import Property, PropertyView
-from .pagination import PropertyPagination
+from .exports import EXPORT_CONTENT_TYPES, export_properties
+from .facets import get_facets, get_normalized_filters, get_search_queryset
+from .imports import get_import_format, import_properties, read_rows
+from .locality import AUTOCOMPLETE_FIELDS, autocomplete_index, filter_by_location
+from .models import Property, PropertyViewRollup
+from .pagination import PropertyListPagination, PropertySearchPagination
+from .representations import (
+    RESULTS_MARKER,
+    accepts_representation,
+    get_contents,
+    get_version,
+    is_materialized,
+    render_content_response,
+    render_response,
+    representation_values,
+)
 from .serializers import (
+    PropertyAutocompleteSerializer,
     PropertyCreateSerializer,
     PropertySerializer,
-    PropertyViewSerializer,
+    PropertyTombstoneSerializer,
+    PropertyViewsBucketSerializer,
 )
+from .tracking import get_viewer_ip, view_recorder
 
 logger = logging.getLogger(__name__)
 
@@ -36,70 +83,462 @@ class PropertyFilter(django_filters.FilterSet):
         fields = ["advert_type", "property_type", "price"]
 
 
-class ListAllPropertiesAPIView(generics.ListAPIView):
+class PropertyLocationSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` matches city, street address and postal code by trigram
+    similarity, closest matches first, and a country by name or code
+    exactly, e.g. both Bra in Italy and Brazil for "bra".
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+
+        country_code = countries.alpha2(query) or countries.by_name(query)
+        return filter_by_location(queryset, query, country=country_code or None)
+
+
+class PropertyListValidatorsMixin(ConditionalListMixin):
+    """
+    Validate list pages by the generation counters their cache keys are
+    built from, which every write, view flush and agent rename bumps, so a
+    revalidation costs no query.
+    """
+
+    def get_validators(self, request, *args, **kwargs):
+        generations = {
+            name: get_generation(name) for name in self.get_cache_generations()
+        }
+        return generations, None
+
+
+class MaterializedListMixin:
+    """
+    Serve list pages by splicing together stored representations when
+    PROPERTY_MATERIALIZED_JSON is on.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not is_materialized(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        extra_fields = self.paginator.get_ordering_fields(queryset)
+        page = self.paginate_queryset(representation_values(queryset, extra_fields))
+        response = self.get_paginated_response(RESULTS_MARKER)
+        return render_response(response, request, get_contents(page))
+
+
+class ListAllPropertiesAPIView(
+    PropertyListValidatorsMixin,
+    CachedListMixin,
+    MaterializedListMixin,
+    CompiledListMixin,
+    generics.ListAPIView,
+):
     serializer_class = PropertySerializer
     queryset = Property.objects.all().order_by("-created_at")
-    pagination_class = PropertyPagination
+    pagination_class = PropertyListPagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        PropertyLocationSearchFilter,
         filters.OrderingFilter,
     ]
 
     filterset_class = PropertyFilter
-    search_fields = ["country", "city"]
     ordering_fields = ["created_at"]
 
+    def get_cache_timeout(self):
+        return settings.PROPERTY_LIST_CACHE_TIMEOUT
 
-class ListAgentsPropertiesAPIView(generics.ListAPIView):
+    def get_cache_generations(self):
+        return [LIST_GENERATION]
+
+
+class ListAgentsPropertiesAPIView(
+    PropertyListValidatorsMixin,
+    CachedListMixin,
+    MaterializedListMixin,
+    CompiledListMixin,
+    generics.ListAPIView,
+):
     serializer_class = PropertySerializer
-    pagination_class = PropertyPagination
+    queryset = Property.objects.all().order_by("-created_at")
+    pagination_class = PropertyListPagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        PropertyLocationSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_class = PropertyFilter
-    search_fields = ["country", "city"]
     ordering_fields = ["created_at"]
 
+    def get_cache_timeout(self):
+        return settings.PROPERTY_LIST_CACHE_TIMEOUT
+
+    def get_cache_generations(self):
+        # The key is per agent through their own generation counter
+        return [get_agent_generation(self.request.user.pk)]
+
     def get_queryset(self):
         user = self.request.user
-        queryset = Property.objects.filter(user=user).order_by("-created_at")
+        queryset = super().get_queryset().filter(user=user)
         return queryset
 
 
-class PropertyViewsAPIView(generics.ListAPIView):
-    serializer_class = PropertyViewSerializer
-    queryset = PropertyView.objects.all()
+def parse_bucket_bound(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(value)
+        parsed = datetime.combine(date, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class PropertyViewsAPIView(APIView):
+    """
+    Time series of views from the hourly/daily rollups, for one of the
+    agent's properties (``?property=<slug>``) or for all of them.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    default_windows = {
+        PropertyViewRollup.Granularity.HOUR: timedelta(hours=48),
+        PropertyViewRollup.Granularity.DAY: timedelta(days=30),
+    }
+
+    def get(self, request):
+        params = request.query_params
+        granularity = params.get("granularity", PropertyViewRollup.Granularity.DAY)
+        if granularity not in PropertyViewRollup.Granularity.values:
+            return Response(
+                {
+                    "error": f"Granularity must be one of {PropertyViewRollup.Granularity.values}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            until = parse_bucket_bound(params["until"]) if "until" in params else None
+            since = parse_bucket_bound(params["since"]) if "since" in params else None
+        except ValueError as error:
+            return Response(
+                {"error": f"Invalid date {error}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        until = until or timezone.now()
+        since = since or until - self.default_windows[granularity]
+
+        queryset = PropertyViewRollup.objects.filter(
+            granularity=granularity,
+            bucket__gte=since,
+            bucket__lt=until,
+            property__user=request.user,
+        )
+
+        slug = params.get("property", None)
+        if slug:
+            try:
+                property = Property.objects.get(slug=slug)
+            except Property.DoesNotExist:
+                raise PropertyNotFound
+
+            if property.user != request.user:
+                return Response(
+                    {
+                        "error": "You cannot view analytics of a property that does not belongs to you"
+                    },
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            queryset = queryset.filter(property=property)
+
+        series = (
+            queryset.values("bucket").annotate(views=Sum("views")).order_by("bucket")
+        )
+        serializer = PropertyViewsBucketSerializer(series, many=True)
+
+        return Response(
+            {
+                "property": slug,
+                "granularity": granularity,
+                "since": timezone.localtime(since),
+                "until": timezone.localtime(until),
+                "total": sum(bucket["views"] for bucket in serializer.data),
+                "series": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class PropertyAutocompleteAPIView(APIView):
+    """
+    Location suggestions for ``?q=<prefix>``, optionally restricted to one
+    ``kind`` (city, country or postal_code), most listed first.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        params = request.query_params
+        prefix = params.get("q", "").strip()
+
+        kind = params.get("kind", None)
+        if kind and kind not in AUTOCOMPLETE_FIELDS:
+            return Response(
+                {"error": f"Kind must be one of {list(AUTOCOMPLETE_FIELDS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = int(params.get("limit", settings.PROPERTY_AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            return Response(
+                {"error": "Limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, settings.PROPERTY_AUTOCOMPLETE_MAX_LIMIT))
+
+        suggestions = []
+        if prefix:
+            suggestions = autocomplete_index.suggest(
+                prefix, fields=(kind,) if kind else None, limit=limit
+            )
+        serializer = PropertyAutocompleteSerializer(
+            [
+                {"kind": field, "value": value, "label": label, "count": count}
+                for field, value, label, count in suggestions
+            ],
+            many=True,
+        )
+        return Response({"results": serializer.data}, status=status.HTTP_200_OK)
+
+
+class PropertyChangesAPIView(APIView):
+    """
+    Properties created, updated or deleted since ``cursor``, at most
+    ``limit`` at a time. Follow ``next`` while ``has_more`` is true, then
+    keep it to poll for later changes. View counts are tallied without
+    updating properties, so they are not reported as changes.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            limit = int(params.get("limit", settings.PROPERTY_CHANGES_LIMIT))
+        except ValueError:
+            return Response(
+                {"error": "Limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, settings.PROPERTY_CHANGES_MAX_LIMIT))
+
+        token = params.get("cursor", None)
+        position = decode_cursor(token) if token else None
+
+        compiled = CompiledSerializer(
+            PropertySerializer,
+            context={"request": request},
+            **get_field_selection(params),
+        )
+        queryset = compiled.values(Property.objects.all(), ["pkid", "updated_at"])
+        changed, deleted, position, has_more = get_changes(position, limit, queryset)
+
+        next_url = replace_query_param(
+            request.build_absolute_uri(), "cursor", encode_cursor(position)
+        )
+        return Response(
+            {
+                "has_more": has_more,
+                "next": next_url,
+                "changed": compiled.to_representation(changed),
+                "deleted": PropertyTombstoneSerializer(deleted, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class PropertyExportAPIView(generics.GenericAPIView):
+    """
+    Every published property matching the list filters, streamed as JSON
+    lines or, with ``?export_format=csv``, as CSV. ``?fields=`` and
+    ``?exclude=`` narrow the columns.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    serializer_class = PropertySerializer
+    queryset = Property.published.order_by("pkid")
+    filter_backends = [
+        DjangoFilterBackend,
+        PropertyLocationSearchFilter,
+        filters.OrderingFilter,
+    ]
+
+    filterset_class = PropertyFilter
+    ordering_fields = ["created_at"]
+
+    def get(self, request):
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {
+                    "error": f"Export format must be one of {', '.join(EXPORT_CONTENT_TYPES)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        content = export_properties(
+            self.filter_queryset(self.get_queryset()),
+            export_format,
+            context=self.get_serializer_context(),
+            **get_field_selection(request.query_params),
+        )
+        response = StreamingHttpResponse(
+            content, content_type=EXPORT_CONTENT_TYPES[export_format]
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="properties.{export_format}"'
+        return response
 
 
 class PropertyDetailAPIView(APIView):
+    def get_validators(self, request, slug):
+        # Versioned by updated_at, the view count, which view counting
+        # changes without touching updated_at, the agent's profile and the
+        # serializer's fields
+        pointer = load_detail_version(slug)
+        if pointer is None:
+            return None
+        _, version, last_modified = pointer
+        return [get_version(), version], last_modified
+
+    @conditional_get
     def get(self, request, slug):
-        property = Property.objects.get(slug=slug)
-
-        # Get IP address of the user
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        if x_forwarded_for:
-            viewer_ip = x_forwarded_for.split(",")[0]
-        else:
-            viewer_ip = request.META.get("REMOTE_ADDR")
+        # Views are buffered and written in batches by the view recorder,
+        # so reading a property never writes to the database inline
+        if settings.PROPERTY_DETAIL_CACHE_TIMEOUT and accepts_representation(request):
+            cached = get_cached_detail(slug)
+            if cached is None:
+                raise PropertyNotFound
+            pkid, content = cached
+            view_recorder.record(pkid, get_viewer_ip(request))
+            return render_content_response(content, request)
+
+        if is_materialized(request):
+            rows = list(representation_values(Property.objects.filter(slug=slug)))
+            if not rows:
+                raise PropertyNotFound
+            view_recorder.record(rows[0].pkid, get_viewer_ip(request))
+            return render_content_response(get_contents(rows)[0], request)
+
+        selection = get_field_selection(request.query_params)
+        queryset = PropertySerializer.setup_queryset(
+            Property.objects.all(), **selection
+        )
+        try:
+            property = queryset.get(slug=slug)
+        except Property.DoesNotExist:
+            raise PropertyNotFound
 
-        # If the view for the property and user does not exists
-        # then create one
-        if not PropertyView.objects.filter(
-            property=property, viewer_ip=viewer_ip
-        ).exists():
-            PropertyView.objects.create(property=property, viewer_ip=viewer_ip)
-            property.views += 1
-            property.save()
+        view_recorder.record(property.pkid, get_viewer_ip(request))
 
         context = {"request": request}
-        serializer = PropertySerializer(property, context)
+        serializer = PropertySerializer(property, context=context, **selection)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+def get_lookup_values(data, name):
+    """Distinct values of a comma-separated string or list in ``data``."""
+    values = data.get(name, None) or []
+    if isinstance(values, str):
+        values = values.split(",")
+    if not isinstance(values, list):
+        return None
+    return list(dict.fromkeys(str(value).strip() for value in values if value))
+
+
+class PropertyBatchDetailAPIView(APIView):
+    """
+    Details of up to PROPERTY_BATCH_DETAIL_MAX_ITEMS properties by ``slugs``
+    or ``ids``, comma-separated in the query string (GET) or lists in the
+    body (POST), in the order asked for. Slugs or ids that match nothing are
+    listed under ``missing``. Views are only recorded with
+    ``record_views=true``.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        return self.lookup(request, request.query_params)
+
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            raise ValidationError("Pass an object holding slugs or ids")
+        return self.lookup(request, request.data)
+
+    def lookup(self, request, data):
+        field = "slug" if "slugs" in data else "id"
+        values = get_lookup_values(data, f"{field}s")
+        if not values:
+            return Response(
+                {"error": "Pass a list of slugs or ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_items = settings.PROPERTY_BATCH_DETAIL_MAX_ITEMS
+        if len(values) > max_items:
+            return Response(
+                {"error": f"Ask for at most {max_items} properties at a time"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Ids are matched in their canonical form, and malformed ones match
+        # nothing
+        keys = {}
+        for value in values:
+            if field == "slug":
+                keys[value] = value
+                continue
+            try:
+                keys[value] = str(uuid.UUID(value))
+            except ValueError:
+                pass
+
+        queryset = Property.objects.filter(**{f"{field}__in": set(keys.values())})
+        materialized = is_materialized(request)
+        if materialized:
+            rows = representation_values(queryset, [field])
+        else:
+            compiled = CompiledSerializer(
+                PropertySerializer,
+                context={"request": request},
+                **get_field_selection(request.query_params),
+            )
+            rows = compiled.values(queryset, ["pkid", field])
+
+        found = {str(getattr(row, field)): row for row in rows}
+        rows = [found[keys[value]] for value in values if keys.get(value) in found]
+        missing = [value for value in values if keys.get(value) not in found]
+
+        if data.get("record_views", None) in (True, "true", "1"):
+            viewer_ip = get_viewer_ip(request)
+            for row in rows:
+                view_recorder.record(row.pkid, viewer_ip)
+
+        if materialized:
+            response = Response({"results": RESULTS_MARKER, "missing": missing})
+            return render_response(response, request, get_contents(rows))
+        return Response(
+            {"results": compiled.to_representation(rows), "missing": missing},
+            status=status.HTTP_200_OK,
+        )
+
+
 @api_view(["PUT"])
 @permission_classes([permissions.IsAuthenticated])
 def update_property_api_view(request, slug):
@@ -141,6 +580,50 @@ def create_property_api_view(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
+def import_properties_api_view(request):
+    """
+    Import properties for the requesting agent from a JSON list of rows, or
+    from an uploaded CSV or JSON lines ``file``. Invalid rows are reported
+    by position and skipped.
+    """
+    upload = request.FILES.get("file", None)
+    if upload is not None:
+        import_format = get_import_format(upload.name)
+        if import_format is None:
+            raise ValidationError({"file": "Upload a .csv, .jsonl or .ndjson file"})
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            rows = list(
+                islice(
+                    read_rows(stream, import_format),
+                    settings.PROPERTY_IMPORT_MAX_ROWS + 1,
+                )
+            )
+        except (UnicodeDecodeError, csv.Error) as error:
+            raise ValidationError({"file": f"Could not read the file: {error}"})
+    else:
+        rows = request.data
+        if not isinstance(rows, list):
+            raise ValidationError(
+                "Send a list of properties, or a CSV or JSON lines file"
+            )
+
+    if len(rows) > settings.PROPERTY_IMPORT_MAX_ROWS:
+        raise ValidationError(
+            f"Import at most {settings.PROPERTY_IMPORT_MAX_ROWS} properties at a time"
+        )
+
+    report = import_properties(rows, request.user)
+    logger.info(
+        f"{report['created']} properties have been imported by {request.user.username}"
+    )
+    if report["created"] or not report["errors"]:
+        return Response(report, status=status.HTTP_201_CREATED)
+    return Response(report, status=status.HTTP_400_BAD_REQUEST)
+
+
 @api_view(["DELETE"])
 @permission_classes([permissions.IsAuthenticated])
 def delete_property_api_view(request, slug):
@@ -184,107 +667,83 @@ def upload_property_image(request):
 
 
 class PropertySearchAPIView(APIView):
+    """
+    Search published properties by criteria in the query string (GET) or
+    the body (POST). Pages are cached per canonical filter set until a
+    published property changes.
+    """
+
     permission_classes = [permissions.AllowAny]
     serializer_class = PropertyCreateSerializer
 
+    def get_validators(self, request):
+        return get_search_generations(), None
+
+    @conditional_get
+    def get(self, request):
+        return self.search(request, request.query_params)
+
     def post(self, request):
-        queryset = Property.objects.filter(published_status=True)
-        data = self.request.data
-
-        advert_type = data.get("advert_type", None)
-        if advert_type:
-            queryset = queryset.filter(advert_type__iexact=advert_type)
-
-        property_type = data.get("property_type", None)
-        if property_type:
-            queryset = queryset.filter(property_type__iexact=property_type)
-
-        price = data.get("price", None)
-
-        if price == "below₹1L":
-            price = 100000
-        elif price == "below₹10L":
-            price = 1000000
-        elif price == "below₹50L":
-            price = 5000000
-        elif price == "below₹1Cr":
-            price = 10000000
-        elif price == "below₹10Cr":
-            price = 100000000
-        elif price == "below₹100Cr":
-            price = 1000000000
-        elif price == "any" or price is None:
-            price = -1
-
-        if price != -1:
-            queryset = queryset.filter(price__lte=price)
-
-        number_of_bedrooms = data.get("number_of_bedrooms", None)
-
-        if number_of_bedrooms == "0":
-            number_of_bedrooms = 0
-        elif number_of_bedrooms == "1-2":
-            number_of_bedrooms_gte = 1
-            number_of_bedrooms_lte = 2
-        elif number_of_bedrooms == "3-5":
-            number_of_bedrooms_gte = 3
-            number_of_bedrooms_lte = 5
-        elif number_of_bedrooms == "6-10":
-            number_of_bedrooms_gte = 6
-            number_of_bedrooms_lte = 10
-        elif number_of_bedrooms == "10-20":
-            number_of_bedrooms_gte = 10
-            number_of_bedrooms_lte = 20
-        elif number_of_bedrooms == "20+":
-            number_of_bedrooms_gte = 20
-        elif number_of_bedrooms == "any" or number_of_bedrooms is None:
-            number_of_bedrooms = -1
-
-        if number_of_bedrooms == 0:
-            queryset = queryset.filter(number_of_bedrooms=number_of_bedrooms)
-        elif number_of_bedrooms == 20:
-            queryset = queryset.filter(number_of_bedrooms__gte=number_of_bedrooms_gte)
-        elif number_of_bedrooms != -1:
-            queryset = queryset.filter(
-                number_of_bedrooms__gte=number_of_bedrooms_gte,
-                number_of_bedrooms__lte=number_of_bedrooms_lte,
+        return self.search(request, request.data)
+
+    def search(self, request, data):
+        filters = get_normalized_filters(data)
+        selection = get_field_selection(request.query_params)
+        materialized = is_materialized(request)
+        paginator = PropertySearchPagination()
+
+        timeout = settings.PROPERTY_SEARCH_CACHE_TIMEOUT
+        cached = None
+        if timeout:
+            cache_key = make_cache_key(
+                "properties:search",
+                get_search_generations(),
+                filters,
+                paginator.get_page_params(request),
+                selection,
+                materialized,
             )
+            cached = cache.get(cache_key)
 
-        number_of_bathrooms = data.get("number_of_bathrooms", None)
-
-        if number_of_bathrooms == "0":
-            number_of_bathrooms = 0
-        elif number_of_bathrooms == "1-2":
-            number_of_bathrooms_gte = 1
-            number_of_bathrooms_lte = 2
-        elif number_of_bathrooms == "3-5":
-            number_of_bathrooms_gte = 3
-            number_of_bathrooms_lte = 5
-        elif number_of_bathrooms == "6-10":
-            number_of_bathrooms_gte = 6
-            number_of_bathrooms_lte = 10
-        elif number_of_bathrooms == "10+":
-            number_of_bathrooms_gte = 10
-        elif number_of_bathrooms == "any" or number_of_bathrooms is None:
-            number_of_bathrooms = -1
-
-        if number_of_bathrooms == 0:
-            queryset = queryset.filter(number_of_bathrooms=number_of_bathrooms)
-        elif number_of_bathrooms == 10:
-            queryset = queryset.filter(number_of_bathrooms__gte=number_of_bathrooms_gte)
-        elif number_of_bathrooms != -1:
-            queryset = queryset.filter(
-                number_of_bathrooms__gte=number_of_bathrooms_gte,
-                number_of_bathrooms__lte=number_of_bathrooms_lte,
-            )
+        if cached is not None:
+            state, results = cached
+            paginator.set_page_state(request, state)
+        else:
+            results = self.get_page(paginator, filters, selection, materialized)
+            if timeout:
+                cache.set(cache_key, (paginator.get_page_state(), results), timeout)
+
+        if materialized:
+            response = paginator.get_paginated_response(RESULTS_MARKER)
+            return render_response(response, request, results, absolute_urls=False)
+        return paginator.get_paginated_response(results)
+
+    def get_page(self, paginator, filters, selection, materialized):
+        queryset = get_search_queryset(
+            filters, criteria=True, limit=settings.PROPERTY_SEARCH_MAX_RESULTS
+        )
+        if materialized:
+            extra_fields = paginator.get_ordering_fields(queryset)
+            queryset = representation_values(queryset, extra_fields)
+            page = paginator.paginate_queryset(queryset, self.request, view=self)
+            return get_contents(page)
 
-        query = data.get("query", None)
-        if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query)
-                | Q(description__icontains=query)
-                | Q(street_address__icontains=query)
-            )
+        compiled = CompiledSerializer(PropertySerializer, **selection)
+        queryset = compiled.values(queryset, paginator.get_ordering_fields(queryset))
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        return compiled.to_representation(page)
 
-        serializer = PropertySerializer(queryset, many=True)
-        return Response(serializer.data)
+
+class PropertyFacetsAPIView(APIView):
+    """
+    Counts for every advert type, property type, price, bedroom and bathroom
+    option under the same criteria PropertySearchAPIView accepts.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        return Response(get_facets(request.query_params), status=status.HTTP_200_OK)
+
+    def post(self, request):
+        return Response(get_facets(request.data), status=status.HTTP_200_OK)
@@ -35,6 +35,7 @@ DJANGO_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
 ]
 
 SITE_ID = 1
@@ -145,10 +146,175 @@ AUTH_USER_MODEL = "users.User"
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "apps.common.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "apps.common.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 
+# Cache
+# Generation counters, detail pointers and cached pages are only coherent
+# when every worker shares one cache, so the default is a file-based cache
+# that every process on the host sees. Its add() and incr() are not atomic
+# across processes, though, so the detail rebuild lock only keeps one worker
+# per process from rebuilding an entry. Set CACHE_URL to a Redis or Memcached
+# server (e.g. memcache://memcached:11211) when workers run on several hosts,
+# or to get a rebuild lock that holds across workers.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="filecache:///var/tmp/landscapes_cache")
+}
+
+
+# Property views configuration
+# Views are buffered in process and flushed every PROPERTY_VIEW_FLUSH_INTERVAL
+# seconds, or as soon as PROPERTY_VIEW_BUFFER_SIZE distinct views are pending.
+# An interval of 0 writes every view synchronously.
+PROPERTY_VIEW_FLUSH_INTERVAL = 5
+PROPERTY_VIEW_BUFFER_SIZE = 500
+# "exact" keeps one PropertyView row per viewer IP as an audit trail, while
+# "sketch" dedupes with a rotating Bloom filter and estimates unique viewers
+# with a HyperLogLog sketch stored on PropertyViewSketch.
+PROPERTY_VIEW_COUNTING = "exact"
+PROPERTY_VIEW_BLOOM_CAPACITY = 10000
+PROPERTY_VIEW_BLOOM_ERROR_RATE = 0.01
+PROPERTY_VIEW_BLOOM_ROTATION = timedelta(days=30)
+# Views are rolled up into hourly and daily buckets as they are flushed. The
+# compact_property_views command purges raw rows and hourly buckets past
+# these windows; daily buckets are kept. With --rebuild it first recomputes
+# the buckets still covered by raw rows from them (exact counting only).
+PROPERTY_VIEW_RAW_RETENTION_DAYS = 90
+PROPERTY_VIEW_HOURLY_RETENTION_DAYS = 14
+
+
+# Property list pagination
+# "page" keeps page number pagination, "cursor" switches the property lists
+# to keyset pagination. Clients can also ask for either with ?pagination=.
+PROPERTY_PAGINATION_MODE = "page"
+# Property search always pages with cursors. Clients can page through at most
+# PROPERTY_SEARCH_MAX_RESULTS results, and the total is counted "exact",
+# "estimated" (planner estimate on PostgreSQL) or "none" by default.
+PROPERTY_SEARCH_MAX_RESULTS = 1000
+PROPERTY_SEARCH_MAX_PAGE_SIZE = 100
+PROPERTY_SEARCH_COUNT_MODE = "estimated"
+
+# Search buckets
+# Labels accepted by the price, bedroom and bathroom search criteria, mapped
+# to inclusive (min, max) bounds where None leaves that side open. "any" is
+# always accepted and does not filter.
+PROPERTY_SEARCH_BUCKETS = {
+    "price": {
+        "below₹1L": (None, 100000),
+        "below₹10L": (None, 1000000),
+        "below₹50L": (None, 5000000),
+        "below₹1Cr": (None, 10000000),
+        "below₹10Cr": (None, 100000000),
+        "below₹100Cr": (None, 1000000000),
+    },
+    "number_of_bedrooms": {
+        "0": (0, 0),
+        "1-2": (1, 2),
+        "3-5": (3, 5),
+        "6-10": (6, 10),
+        "10-20": (10, 20),
+        "20+": (20, None),
+    },
+    "number_of_bathrooms": {
+        "0": (0, 0),
+        "1-2": (1, 2),
+        "3-5": (3, 5),
+        "6-10": (6, 10),
+        "10+": (10, None),
+    },
+}
+
+# Facet counts and search result pages are cached per normalised filter set
+# until a published property changes; search pages also until view counts
+# are next flushed, since they show them. Entries left behind expire after
+# PROPERTY_FACETS_CACHE_TTL and PROPERTY_SEARCH_CACHE_TIMEOUT seconds; a
+# search timeout of 0 disables the search cache.
+PROPERTY_FACETS_CACHE_TTL = 60 * 60
+PROPERTY_SEARCH_CACHE_TIMEOUT = 60 * 60
+
+# Materialized representations
+# When enabled, each property's public JSON is rendered when it changes and
+# stored pre-encoded in PropertyRepresentation, and JSON responses splice the
+# stored bytes together. Run rebuild_property_representations after turning
+# it on or changing PropertySerializer.
+PROPERTY_MATERIALIZED_JSON = False
+
+# List caching
+# Rendered property list and agent list pages are cached per normalised query
+# string and invalidated by generation counters bumped whenever a property,
+# its view count or its agent's username changes. Entries left behind by an
+# older generation expire after PROPERTY_LIST_CACHE_TIMEOUT seconds; 0
+# disables the cache.
+PROPERTY_LIST_CACHE_TIMEOUT = 60 * 60
+
+# Detail caching
+# Property details are cached per slug and versioned by the property's
+# updated_at and view count. A single worker rebuilds an out of date entry
+# while the others serve the previous copy, or wait up to
+# PROPERTY_DETAIL_CACHE_LOCK_TIMEOUT seconds when there is none. 0 disables
+# the cache.
+PROPERTY_DETAIL_CACHE_TIMEOUT = 60 * 60
+PROPERTY_DETAIL_CACHE_LOCK_TIMEOUT = 5
+
+# Batch details
+# The batch detail endpoint looks up at most PROPERTY_BATCH_DETAIL_MAX_ITEMS
+# properties per request.
+PROPERTY_BATCH_DETAIL_MAX_ITEMS = 50
+
+
+# Change feed
+# The change feed returns at most PROPERTY_CHANGES_MAX_LIMIT changes per
+# request and only reports changes PROPERTY_CHANGES_SETTLE_SECONDS old, so
+# transactions still in flight cannot be skipped. Tombstones of deleted
+# properties are pruned after PROPERTY_TOMBSTONE_RETENTION_DAYS, and older
+# cursors must sync from scratch.
+PROPERTY_CHANGES_LIMIT = 100
+PROPERTY_CHANGES_MAX_LIMIT = 500
+PROPERTY_CHANGES_SETTLE_SECONDS = 5
+PROPERTY_TOMBSTONE_RETENTION_DAYS = 30
+
+
+# Bulk import
+# Imported rows are validated and inserted PROPERTY_IMPORT_BATCH_SIZE at a
+# time, each batch in its own transaction. The import endpoint takes at most
+# PROPERTY_IMPORT_MAX_ROWS rows per request; the import_properties command
+# has no limit.
+PROPERTY_IMPORT_BATCH_SIZE = 1000
+PROPERTY_IMPORT_MAX_ROWS = 10000
+
+# Bulk export
+# Exports read and encode PROPERTY_EXPORT_CHUNK_SIZE rows at a time.
+PROPERTY_EXPORT_CHUNK_SIZE = 2000
+
+# Fuzzy location matching
+# Minimum trigram similarity for city, street address and postal code
+# matches. Off PostgreSQL, an in-process trigram index of distinct values
+# serves the lookups, returns at most PROPERTY_FUZZY_MATCH_LIMIT values per
+# field and is rebuilt every PROPERTY_LOCALITY_INDEX_TTL seconds.
+PROPERTY_FUZZY_MATCH_THRESHOLD = 0.3
+PROPERTY_FUZZY_MATCH_LIMIT = 50
+PROPERTY_LOCALITY_INDEX_TTL = 300
+
+# Location autocomplete
+# Suggestions come from an in-process prefix index of published cities,
+# countries and postal codes. At most PROPERTY_AUTOCOMPLETE_SCAN_LIMIT prefix
+# matches are ranked by listing count and the top PROPERTY_AUTOCOMPLETE_LIMIT
+# are returned.
+PROPERTY_AUTOCOMPLETE_LIMIT = 10
+PROPERTY_AUTOCOMPLETE_MAX_LIMIT = 50
+PROPERTY_AUTOCOMPLETE_SCAN_LIMIT = 500
+
+
 # Simple_JWT configuration
 SIMPLE_jwt = {
     "AUTH_HEADER_TYPES": {